@@ -25,3 +25,6 @@ class CoreConfig(AppConfig):
             Group.objects.get_or_create(name=worker_group)
 
         post_migrate.connect(ensure_role_groups, sender=self)
+
+        # Rol cache'ini (role_cache.py) uyelik/grup degisince temizle
+        from apps.core import signals  # noqa: F401
@@ -0,0 +1,83 @@
+"""Istek basina bir kez hesaplanan sube / rol bilgisi.
+
+BranchContextMiddleware bunu `request.branch_ctx` olarak ekler; permissions,
+roles ve context processor ayni nesneyi okur (tekrar sorgu yok).
+"""
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+from apps.core.models import Branch, BranchMembership
+from apps.core.role_cache import get_user_roles
+from apps.core.roles import group_names
+
+ADMIN_ROLES = (BranchMembership.ROLE_ADMIN, BranchMembership.ROLE_MANAGER)
+WORKER_ROLES = (BranchMembership.ROLE_TECH, BranchMembership.ROLE_WASH)
+
+
+@dataclass
+class BranchContext:
+    branch_id: Optional[int] = None
+    branch: Optional[Branch] = None
+    role: Optional[str] = None
+    memberships: list = field(default_factory=list)  # aktif uyelikler (branch select_related)
+    groups: frozenset = frozenset()
+
+    @property
+    def is_admin_role(self) -> bool:
+        return self.role in ADMIN_ROLES
+
+    @property
+    def is_worker_role(self) -> bool:
+        return self.role in WORKER_ROLES
+
+    def role_for(self, branch_id) -> Optional[str]:
+        for bm in self.memberships:
+            if bm.branch_id == int(branch_id):
+                return bm.role
+        return None
+
+
+ANONYMOUS = BranchContext()
+
+
+def _resolve(request) -> BranchContext:
+    user = getattr(request, "user", None)
+    if not user or not user.is_authenticated:
+        return ANONYMOUS
+
+    memberships = get_user_roles(user)["memberships"]
+
+    bid = request.session.get("active_branch_id")
+    # Aktif sube yoksa ilk uyeligi sec
+    if not bid and memberships:
+        bid = memberships[0].branch_id
+        request.session["active_branch_id"] = bid
+
+    active = next((bm for bm in memberships if bm.branch_id == int(bid)), None) if bid else None
+    if active:
+        branch = active.branch
+    else:
+        branch = Branch.objects.filter(id=bid).first() if bid else None
+
+    return BranchContext(
+        branch_id=bid,
+        branch=branch,
+        role=active.role if active else None,
+        memberships=memberships,
+        groups=group_names(user),
+    )
+
+
+def get_branch_context(request) -> BranchContext:
+    """Middleware calismamissa (orn. testlerde) ilk cagrida hesaplar ve saklar."""
+    ctx = getattr(request, "branch_ctx", None)
+    if ctx is None:
+        ctx = _resolve(request)
+        request.branch_ctx = ctx
+    return ctx
+
+
+def invalidate_branch_context(request) -> None:
+    """Aktif sube degisince (switch_branch) ayni istekte yeniden hesaplansin."""
+    request.branch_ctx = None
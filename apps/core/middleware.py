@@ -1,9 +1,25 @@
 from django.shortcuts import redirect
 from django.conf import settings
 
+from apps.core.branch_context import get_branch_context
 from apps.core.permissions import is_worker_request, is_admin_request
 
 
+class BranchContextMiddleware:
+    """
+    Aktif şube + üyelik rolü + grup bilgisini istek başına BİR kez hesaplar
+    ve `request.branch_ctx` olarak ekler. AuthenticationMiddleware'den sonra olmalı.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.branch_ctx = None
+        if request.user.is_authenticated:
+            get_branch_context(request)
+        return self.get_response(request)
+
+
 class WorkerLockdownMiddleware:
     """
     Usta kullanıcıyı sadece /workorders/my/ alanında tutar.
@@ -0,0 +1,55 @@
+"""Keyset (cursor) sayfalama yardimcilari.
+
+OFFSET yerine (zaman, id) cifti uzerinden "son gorulen kayittan sonrasi" sorgulanir;
+boylece gecmis buyudukce sayfa maliyeti sabit kalir.
+Sorgu `-<field>, -id` sirasinda olmali.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+from django.db.models import Q
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+
+@dataclass
+class KeysetPage:
+    items: list = field(default_factory=list)
+    next_cursor: str = ""
+    has_next: bool = False
+
+
+def encode_cursor(value: datetime, pk: int) -> str:
+    return urlsafe_base64_encode(f"{value.isoformat()}|{pk}".encode())
+
+
+def decode_cursor(cursor: str) -> Optional[tuple]:
+    """Gecersiz/bozuk cursor -> None (ilk sayfa)."""
+    if not cursor:
+        return None
+    try:
+        raw = urlsafe_base64_decode(cursor).decode()
+        ts, pk = raw.rsplit("|", 1)
+        return datetime.fromisoformat(ts), int(pk)
+    except Exception:
+        return None
+
+
+def keyset_page(qs, cursor: str = "", page_size: int = 50, field: str = "created_at") -> KeysetPage:
+    """`qs`'i (field DESC, id DESC) sirasinda bir sayfa olarak dondurur."""
+    qs = qs.order_by(f"-{field}", "-id")
+    key = decode_cursor(cursor)
+    if key:
+        value, pk = key
+        qs = qs.filter(Q(**{f"{field}__lt": value}) | Q(**{field: value, "id__lt": pk}))
+
+    rows = list(qs[: page_size + 1])
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
+
+    next_cursor = ""
+    if has_next and rows:
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, field), last.pk)
+    return KeysetPage(items=rows, next_cursor=next_cursor, has_next=has_next)
@@ -1,23 +1,20 @@
 from django.contrib import messages
 from django.shortcuts import redirect
 from functools import wraps
-from apps.core.models import BranchMembership
+from apps.core.branch_context import ADMIN_ROLES, get_branch_context
 
 def _active_role(request):
-    bid = request.session.get("active_branch_id")
-    qs = BranchMembership.objects.filter(user=request.user, is_active=True)
-    if bid:
-        qs = qs.filter(branch_id=bid)
-    bm = qs.first()
-    return bm.role if bm else None
+    return get_branch_context(request).role
 
 def is_admin_request(request) -> bool:
-    role = _active_role(request)
-    return role in (BranchMembership.ROLE_ADMIN, BranchMembership.ROLE_MANAGER)
+    return get_branch_context(request).is_admin_role
 
 def is_worker_request(request) -> bool:
-    role = _active_role(request)
-    return role in (BranchMembership.ROLE_TECH, BranchMembership.ROLE_WASH)
+    return get_branch_context(request).is_worker_role
+
+def can_manage_branch(request, branch_id) -> bool:
+    """Verilen subede ADMIN/MANAGER mi? (istek baglamindaki uyeliklerden)"""
+    return get_branch_context(request).role_for(branch_id) in ADMIN_ROLES
 
 def admin_required(view):
     @wraps(view)
@@ -0,0 +1,44 @@
+"""Kullanici basina uyelik + grup cache'i (istekler arasi).
+
+Django cache'inde kullanici id'si ile tutulur; BranchMembership / grup /
+sube degisikliklerinde signals.py uzerinden silinir. Ayni cache'i paylasmayan
+process'ler icin (LocMem) ROLE_CACHE_TIMEOUT bayatligi sinirlar.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.core.models import BranchMembership
+
+
+def _key(user_id) -> str:
+    return f"core:roles:{user_id}"
+
+
+def _timeout() -> int:
+    return int(getattr(settings, "ROLE_CACHE_TIMEOUT", 300))
+
+
+def _load(user) -> dict:
+    memberships = list(
+        BranchMembership.objects.filter(user=user, is_active=True).select_related("branch").order_by("id")
+    )
+    groups = frozenset(n.lower() for n in user.groups.values_list("name", flat=True))
+    return {"memberships": memberships, "groups": groups}
+
+
+def get_user_roles(user) -> dict:
+    """{"memberships": [BranchMembership...], "groups": frozenset(kucuk harf)}"""
+    data = cache.get(_key(user.pk))
+    if data is None:
+        data = _load(user)
+        cache.set(_key(user.pk), data, _timeout())
+    return data
+
+
+def invalidate_user_roles(*user_ids) -> None:
+    """Commit sonrasi siler: rollback olan degisiklik / commit oncesi okuma cache'i kirletmez."""
+    keys = [_key(uid) for uid in user_ids if uid]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
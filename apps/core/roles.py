@@ -1,14 +1,25 @@
 from django.conf import settings
 
+from apps.core.role_cache import get_user_roles
+
+
+def group_names(user) -> frozenset:
+    """Kullanicinin grup adlari (kucuk harf); role cache + istek boyunca user nesnesinde."""
+    cached = getattr(user, "_role_group_names", None)
+    if cached is None:
+        cached = get_user_roles(user)["groups"]
+        user._role_group_names = cached
+    return cached
+
 def is_admin(user) -> bool:
     if not user.is_authenticated:
         return False
     admin_group = getattr(settings, "ROLE_ADMIN_GROUP", "ADMIN")
     # Grup adları bazen farklı büyük/küçük harflerle oluşturulabiliyor (ADMIN/Admin/admin).
-    return user.is_superuser or user.groups.filter(name__iexact=admin_group).exists()
+    return user.is_superuser or admin_group.lower() in group_names(user)
 
 def is_worker(user) -> bool:
     if not user.is_authenticated:
         return False
     worker_group = getattr(settings, "ROLE_WORKER_GROUP", "USTA")
-    return user.groups.filter(name__iexact=worker_group).exists()
+    return worker_group.lower() in group_names(user)
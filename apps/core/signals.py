@@ -0,0 +1,53 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from apps.core.models import Branch, BranchMembership
+from apps.core.role_cache import invalidate_user_roles
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=BranchMembership)
+@receiver(post_delete, sender=BranchMembership)
+def _membership_changed(sender, instance, **kwargs):
+    invalidate_user_roles(instance.user_id)
+
+
+@receiver(post_save, sender=Branch)
+def _branch_changed(sender, instance, **kwargs):
+    # Cache'te sube adi / aktifligi de tutuluyor
+    user_ids = BranchMembership.objects.filter(branch=instance).values_list("user_id", flat=True)
+    invalidate_user_roles(*user_ids)
+
+
+@receiver(post_save, sender=Group)
+def _group_changed(sender, instance, created, **kwargs):
+    if not created:
+        invalidate_user_roles(*instance.user_set.values_list("id", flat=True))
+
+
+@receiver(pre_delete, sender=Group)
+def _group_deleting(sender, instance, **kwargs):
+    # Silmede uyelik satirlari post_delete'ten once gider; etkilenenleri simdi al
+    instance._role_user_ids = list(instance.user_set.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=Group)
+def _group_deleted(sender, instance, **kwargs):
+    invalidate_user_roles(*getattr(instance, "_role_user_ids", ()))
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def _user_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear", "post_clear"):
+        return
+    if not reverse:
+        # user.groups.add/remove/set/clear
+        invalidate_user_roles(instance.pk)
+    elif action == "pre_clear":
+        # group.user_set.clear(): kimlerin etkilendigini temizlemeden once al
+        invalidate_user_roles(*instance.user_set.values_list("id", flat=True))
+    elif pk_set:
+        invalidate_user_roles(*pk_set)
@@ -12,6 +12,7 @@ from apps.workorders.models import WorkOrder
 from apps.tirehotel.models import TireHotelEntry
 from apps.customers.models import Vehicle
 
+from apps.core.branch_context import get_branch_context, invalidate_branch_context
 from apps.core.roles import is_admin
 from .forms import AdminUserCreateForm, AdminUserUpdateForm
 
@@ -19,20 +20,10 @@ from .forms import AdminUserCreateForm, AdminUserUpdateForm
 @login_required
 def dashboard(request):
     """Gelen siraya gore 'Acik' isleri gosterir."""
-    memberships = BranchMembership.objects.filter(user=request.user, is_active=True, branch__is_active=True)
-    branches = [m.branch for m in memberships]
-
-    # Ilk kez giriyorsa aktif subeyi atayalim
-    if request.session.get("active_branch_id") is None and branches:
-        request.session["active_branch_id"] = branches[0].id
-
-    active_branch_id = request.session.get("active_branch_id")
-    active_branch = None
-    if active_branch_id:
-        try:
-            active_branch = Branch.objects.get(id=active_branch_id)
-        except Branch.DoesNotExist:
-            active_branch = None
+    # Şube/üyelik bilgisi middleware'de bir kez hesaplandı (ilk şube ataması dahil)
+    bctx = get_branch_context(request)
+    branches = [m.branch for m in bctx.memberships if m.branch.is_active]
+    active_branch = bctx.branch
 
     qs_work = WorkOrder.objects.all().order_by("status", "created_at")
     qs_tire = TireHotelEntry.objects.all().order_by("-created_at")
@@ -62,9 +53,10 @@ def switch_branch(request, branch_id: int):
 
     Navbar dropdown'dan cagirilir. Kullanici o subeye uye ise session'a yazar.
     """
-    has_access = BranchMembership.objects.filter(user=request.user, branch_id=branch_id, is_active=True).exists()
+    has_access = get_branch_context(request).role_for(branch_id) is not None
     if has_access:
         request.session["active_branch_id"] = int(branch_id)
+        invalidate_branch_context(request)
     return redirect(request.META.get("HTTP_REFERER", "/"))
 
 
@@ -6,13 +6,13 @@ from django.views.decorators.http import require_GET
 
 from decimal import Decimal
 
-from apps.core.models import Branch, BranchMembership
+from apps.core.models import Branch
+from apps.core.permissions import can_manage_branch
 from .models import Customer, Vehicle
 
 
 def _can_manage(request, branch_id: int) -> bool:
-    role = BranchMembership.objects.filter(user=request.user, branch_id=branch_id, is_active=True).values_list("role", flat=True).first()
-    return role in (BranchMembership.ROLE_ADMIN, BranchMembership.ROLE_MANAGER)
+    return can_manage_branch(request, branch_id)
 
 
 def _get_branch_id(request):
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Part, StockMove, WorkOrderPart
+from .models import Part, PartStock, StockMove, WorkOrderPart
 
 @admin.register(Part)
 class PartAdmin(admin.ModelAdmin):
@@ -14,3 +14,8 @@ class StockMoveAdmin(admin.ModelAdmin):
 @admin.register(WorkOrderPart)
 class WorkOrderPartAdmin(admin.ModelAdmin):
     list_display = ("id","order","part","qty","unit_price","line_total","created_at")
+
+@admin.register(PartStock)
+class PartStockAdmin(admin.ModelAdmin):
+    list_display = ("id","part","branch","qty","updated_at")
+    search_fields = ("part__name",)
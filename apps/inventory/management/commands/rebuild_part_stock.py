@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.inventory.models import PartStock
+from apps.inventory.services import DEC0, ledger_balances
+
+
+class Command(BaseCommand):
+    help = "PartStock bakiyelerini StockMove defterinden dogrular / yeniden kurar"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--branch", type=int, default=None, help="Sadece bu sube")
+        parser.add_argument("--verify", action="store_true", help="Sadece farklari listele, yazma")
+
+    def handle(self, *args, **options):
+        branch_id = options.get("branch")
+        verify = options.get("verify")
+
+        with transaction.atomic():
+            expected = ledger_balances(branch_id)
+            current_qs = PartStock.objects.select_for_update()
+            if branch_id:
+                current_qs = current_qs.filter(branch_id=branch_id)
+            current = {(s.branch_id, s.part_id): s for s in current_qs}
+
+            diffs = []
+            for key in set(expected) | set(current):
+                want = expected.get(key, DEC0)
+                row = current.get(key)
+                have = row.qty if row else DEC0
+                if want != have:
+                    diffs.append((key, have, want))
+
+            for (bid, pid), have, want in sorted(diffs):
+                self.stdout.write(f"sube={bid} parca={pid}: bakiye={have} defter={want}")
+
+            if verify:
+                if diffs:
+                    self.stdout.write(self.style.ERROR(f"FARK: {len(diffs)} bakiye defterle uyusmuyor"))
+                else:
+                    self.stdout.write(self.style.SUCCESS("OK: tum bakiyeler defterle uyumlu"))
+                return
+
+            to_create, to_update = [], []
+            for (bid, pid), have, want in diffs:
+                row = current.get((bid, pid))
+                if row:
+                    row.qty = want
+                    to_update.append(row)
+                else:
+                    to_create.append(PartStock(branch_id=bid, part_id=pid, qty=want))
+            PartStock.objects.bulk_create(to_create)
+            PartStock.objects.bulk_update(to_update, ["qty"])
+
+        self.stdout.write(self.style.SUCCESS(f"OK: {len(diffs)} bakiye duzeltildi"))
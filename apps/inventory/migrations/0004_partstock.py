@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Q, Sum
+
+
+def fill_part_stock(apps, schema_editor):
+    StockMove = apps.get_model("inventory", "StockMove")
+    PartStock = apps.get_model("inventory", "PartStock")
+    rows = (
+        StockMove.objects.values("branch_id", "part_id")
+        .annotate(
+            in_sum=Sum("qty", filter=Q(move_type="IN")),
+            out_sum=Sum("qty", filter=Q(move_type="OUT")),
+        )
+        .order_by()
+    )
+    PartStock.objects.bulk_create(
+        [
+            PartStock(branch_id=r["branch_id"], part_id=r["part_id"], qty=(r["in_sum"] or 0) - (r["out_sum"] or 0))
+            for r in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('inventory', '0003_part_inventory_p_branch__925a69_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PartStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('qty', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('branch', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='core.branch')),
+                ('part', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balances', to='inventory.part')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('branch', 'part'), name='inventory_partstock_branch_part_uniq')],
+            },
+        ),
+        migrations.RunPython(fill_part_stock, migrations.RunPython.noop),
+    ]
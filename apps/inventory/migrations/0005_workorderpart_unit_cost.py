@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:06
+
+from django.db import migrations, models
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+DECIMAL = DecimalField(max_digits=12, decimal_places=2)
+
+
+def fill_unit_cost(apps, schema_editor):
+    """Eski satirlar: is emrine bagli stok cikisinin maliyeti, yoksa parcanin bugunku maliyeti."""
+    WorkOrderPart = apps.get_model("inventory", "WorkOrderPart")
+    StockMove = apps.get_model("inventory", "StockMove")
+    Part = apps.get_model("inventory", "Part")
+    WorkOrder = apps.get_model("workorders", "WorkOrder")
+
+    move_cost = (
+        StockMove.objects.filter(workorder_id=OuterRef("order_id"), part_id=OuterRef("part_id"), move_type="OUT")
+        .order_by("-created_at", "-id").values("unit_cost")[:1]
+    )
+    part_cost = Part.objects.filter(pk=OuterRef("part_id")).values("cost_price")[:1]
+    WorkOrderPart.objects.update(
+        unit_cost=Coalesce(Subquery(move_cost), Subquery(part_cost), 0, output_field=DECIMAL)
+    )
+
+    cost = (
+        WorkOrderPart.objects.filter(order_id=OuterRef("pk"))
+        .order_by().values("order_id")
+        .annotate(s=Sum(ExpressionWrapper(F("qty") * F("unit_cost"), output_field=DECIMAL))).values("s")
+    )
+    WorkOrder.objects.update(parts_cost=Coalesce(Subquery(cost, output_field=DECIMAL), 0, output_field=DECIMAL))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_partstock'),
+        ('workorders', '0010_workorder_parts_cost'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workorderpart',
+            name='unit_cost',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.RunPython(fill_unit_cost, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from decimal import Decimal
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
 from apps.core.models import Branch
 from apps.workorders.models import WorkOrder
 
@@ -59,10 +60,64 @@ class StockMove(models.Model):
     def signed_qty(self):
         return self.qty if self.move_type == self.TYPE_IN else -self.qty
 
+    def save(self, *args, update_balance: bool = True, **kwargs):
+        """Hareket ile PartStock bakiyesi ayni transaction'da yazilir.
+
+        update_balance=False: bakiye cagiran tarafindan zaten (kosullu UPDATE ile)
+        dusulduyse; bkz. services.consume_stock.
+        """
+        if not update_balance:
+            return super().save(*args, **kwargs)
+        with transaction.atomic():
+            if self._state.adding:
+                old = None
+            else:
+                old = StockMove.objects.filter(pk=self.pk).values("branch_id", "part_id", "move_type", "qty").first()
+            super().save(*args, **kwargs)
+            if old:
+                old_signed = old["qty"] if old["move_type"] == self.TYPE_IN else -old["qty"]
+                PartStock.add(old["branch_id"], old["part_id"], -old_signed)
+            PartStock.add(self.branch_id, self.part_id, self.signed_qty())
+
     def __str__(self):
         return f"{self.part.name} {self.move_type} {self.qty}"
 
 
+class PartStock(models.Model):
+    """(sube, parca) bakiye satiri: StockMove defterinin ozeti.
+
+    Her StockMove kaydi/silinmesi ile ayni transaction'da guncellenir;
+    `rebuild_part_stock` komutu defterden yeniden kurar / dogrular.
+    """
+
+    branch = models.ForeignKey(Branch, on_delete=models.PROTECT)
+    part = models.ForeignKey(Part, on_delete=models.CASCADE, related_name="balances")
+    qty = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["branch", "part"], name="inventory_partstock_branch_part_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.part_id} @ {self.branch_id}: {self.qty}"
+
+    @classmethod
+    def add(cls, branch_id: int, part_id: int, delta) -> None:
+        """Bakiyeyi DB tarafinda (F()) arttir/azalt; satir yoksa olustur."""
+        if not delta:
+            return
+        if cls.objects.filter(branch_id=branch_id, part_id=part_id).update(qty=F("qty") + delta):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(branch_id=branch_id, part_id=part_id, qty=delta)
+        except IntegrityError:
+            # Ayni anda baska bir istek satiri olusturdu
+            cls.objects.filter(branch_id=branch_id, part_id=part_id).update(qty=F("qty") + delta)
+
+
 class WorkOrderPart(models.Model):
     order = models.ForeignKey(WorkOrder, on_delete=models.CASCADE, related_name="parts")
     part = models.ForeignKey(Part, on_delete=models.PROTECT)
@@ -70,11 +125,17 @@ class WorkOrderPart(models.Model):
     qty = models.DecimalField(max_digits=10, decimal_places=2, default=1)
     unit_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     line_total = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    # Kullanım anındaki birim maliyet (StockMove.unit_cost snapshot'ı)
+    unit_cost = models.DecimalField(max_digits=10, decimal_places=2, default=0)
 
     created_at = models.DateTimeField(auto_now_add=True)
 
     def recalc(self):
         self.line_total = (self.qty or Decimal("0")) * (self.unit_price or Decimal("0"))
 
+    def save(self, *args, **kwargs):
+        self.recalc()
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.part.name} x{self.qty}"
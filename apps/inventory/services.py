@@ -1,13 +1,86 @@
 from decimal import Decimal
-from django.db.models import Sum, DecimalField
+from django.db import transaction
+from django.db.models import F, OuterRef, Q, Subquery, Sum, DecimalField
 from django.db.models.functions import Coalesce
-from .models import StockMove
+from .models import PartStock, StockMove
 
 DECIMAL = DecimalField(max_digits=12, decimal_places=2)
 DEC0 = Decimal("0.00")
 
+def _ledger_sums():
+    """IN / OUT toplamlari icin kosullu aggregate ifadeleri (tek GROUP BY)."""
+    return {
+        "in_sum": Coalesce(Sum("qty", filter=Q(move_type=StockMove.TYPE_IN)), DEC0, output_field=DECIMAL),
+        "out_sum": Coalesce(Sum("qty", filter=Q(move_type=StockMove.TYPE_OUT)), DEC0, output_field=DECIMAL),
+    }
+
 def get_stock(branch_id: int, part_id: int) -> Decimal:
-    qs = StockMove.objects.filter(branch_id=branch_id, part_id=part_id)
-    in_sum = qs.filter(move_type=StockMove.TYPE_IN).aggregate(v=Coalesce(Sum("qty"), DEC0, output_field=DECIMAL))["v"]
-    out_sum = qs.filter(move_type=StockMove.TYPE_OUT).aggregate(v=Coalesce(Sum("qty"), DEC0, output_field=DECIMAL))["v"]
-    return (in_sum or DEC0) - (out_sum or DEC0)
+    """PartStock bakiye satirindan tek satir okuma."""
+    qty = PartStock.objects.filter(branch_id=branch_id, part_id=part_id).values_list("qty", flat=True).first()
+    return qty if qty is not None else DEC0
+
+def with_stock(qs, branch_id: int):
+    """Part queryset'ine `stock` annotate eder (ayni sorguda, parca basina sorgu yok)."""
+    balance = PartStock.objects.filter(branch_id=branch_id, part_id=OuterRef("pk")).values("qty")[:1]
+    return qs.annotate(stock=Coalesce(Subquery(balance, output_field=DECIMAL), DEC0, output_field=DECIMAL))
+
+def ledger_balances(branch_id: int | None = None):
+    """StockMove defterinden (branch, part) bakiyeleri, tek gruplu sorgu.
+
+    rebuild/verify icin; normal okumalar PartStock'tan yapilir.
+    """
+    qs = StockMove.objects.all()
+    if branch_id:
+        qs = qs.filter(branch_id=branch_id)
+    rows = qs.values("branch_id", "part_id").annotate(**_ledger_sums()).order_by()
+    return {(r["branch_id"], r["part_id"]): r["in_sum"] - r["out_sum"] for r in rows}
+
+class InsufficientStock(Exception):
+    def __init__(self, available: Decimal, requested: Decimal):
+        self.available = available
+        self.requested = requested
+        super().__init__(f"Stok yetersiz! Mevcut: {available} / İstenen: {requested}")
+
+def consume_stock(branch_id: int, part, qty: Decimal, workorder=None, note: str = "") -> StockMove:
+    """Stok dus (OUT) - yaris durumuna karsi guvenli.
+
+    Bakiye tek bir kosullu UPDATE ile dusulur (`qty >= n` ise); ayni anda son
+    adedi isteyen ikinci istek 0 satir gunceller ve InsufficientStock alir.
+    Sadece ilgili parcanin satiri kilitlenir.
+    """
+    with transaction.atomic():
+        updated = (
+            PartStock.objects.filter(branch_id=branch_id, part_id=part.id, qty__gte=qty)
+            .update(qty=F("qty") - qty)
+        )
+        if not updated:
+            raise InsufficientStock(get_stock(branch_id, part.id), qty)
+
+        move = StockMove(
+            branch_id=branch_id,
+            part=part,
+            move_type=StockMove.TYPE_OUT,
+            qty=qty,
+            unit_cost=part.cost_price or DEC0,
+            note=note,
+            workorder=workorder,
+        )
+        move.save(update_balance=False)
+        return move
+
+def release_stock(branch_id: int, part, qty: Decimal, unit_cost=None, workorder=None, note: str = "") -> StockMove:
+    """Dusulen stogu geri al (IN). Defter append-only kalir.
+
+    unit_cost: cikistaki maliyet (WorkOrderPart.unit_cost snapshot'i); verilmezse parcanin guncel maliyeti.
+    """
+    if unit_cost is None:
+        unit_cost = part.cost_price or DEC0
+    return StockMove.objects.create(
+        branch_id=branch_id,
+        part=part,
+        move_type=StockMove.TYPE_IN,
+        qty=qty,
+        unit_cost=unit_cost,
+        note=note,
+        workorder=workorder,
+    )
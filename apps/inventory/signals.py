@@ -0,0 +1,40 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.workorders.models import WorkOrder
+from apps.workorders.services import recalc_totals
+from .models import PartStock, StockMove, WorkOrderPart
+from .services import release_stock
+
+
+@receiver(post_delete, sender=StockMove)
+def _stock_move_deleted(sender, instance, **kwargs):
+    # Is emri silinince CASCADE ile giden hareketler dahil
+    PartStock.add(instance.branch_id, instance.part_id, -instance.signed_qty())
+
+
+def _is_workorder_delete(origin) -> bool:
+    if isinstance(origin, QuerySet):
+        return origin.model is WorkOrder
+    return isinstance(origin, WorkOrder)
+
+
+@receiver(post_delete, sender=WorkOrderPart)
+def _workorder_part_deleted(sender, instance, origin=None, **kwargs):
+    # Satir tek basina silinirse (modal, admin, queryset) stok cikistaki maliyetle iade edilir.
+    # Is emri silinirken OUT hareketleri de CASCADE ile gider; bakiye _stock_move_deleted ile doner.
+    if _is_workorder_delete(origin):
+        return
+    order = instance.order
+    release_stock(
+        order.branch_id, instance.part, instance.qty, unit_cost=instance.unit_cost,
+        workorder=order, note=f"WorkOrder #{order.pk} iade",
+    )
+
+
+@receiver(post_save, sender=WorkOrderPart)
+@receiver(post_delete, sender=WorkOrderPart)
+def _workorder_part_changed(sender, instance, **kwargs):
+    # parts_total / grand_total DB tarafinda satirlardan
+    recalc_totals(instance.order_id)
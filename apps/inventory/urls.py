@@ -8,6 +8,7 @@ urlpatterns = [
 
     path("parts/<int:pk>/stock-in/", views.part_stock_in, name="part_stock_in"),
     path("workorders/<int:order_id>/add-part/", views.add_part_to_workorder, name="add_part_to_workorder"),
+    path("workorders/<int:order_id>/parts/<int:line_id>/remove/", views.remove_part_from_workorder, name="remove_part_from_workorder"),
     path("api/parts/search/", views.api_parts_search, name="api_parts_search"),
     path("api/parts/<int:pk>/", views.api_part_detail, name="api_part_detail"),
 
@@ -9,7 +9,7 @@ from django.db import models
 
 from apps.core.models import Branch
 from .models import Part, StockMove
-from .services import get_stock
+from .services import InsufficientStock, consume_stock, get_stock, with_stock
 from apps.workorders.models import WorkOrder
 from .models import Part, StockMove, WorkOrderPart
 
@@ -31,13 +31,8 @@ def parts_list(request):
         messages.error(request, "Aktif şube seçili değil.")
         return redirect("/")
 
-    parts = Part.objects.filter(branch=branch, is_active=True).order_by("name")
-    rows = []
-    for p in parts:
-        rows.append({
-            "obj": p,
-            "stock": get_stock(branch.id, p.id),
-        })
+    parts = with_stock(Part.objects.filter(branch=branch, is_active=True), branch.id).order_by("name")
+    rows = [{"obj": p, "stock": p.stock} for p in parts]
 
     return render(request, "inventory/parts_list.html", {
         "rows": rows,
@@ -218,34 +213,51 @@ def add_part_to_workorder(request, order_id: int):
 
     part = get_object_or_404(Part, id=part_id, branch_id=branch_id, is_active=True)
 
-    # ✅ stok kontrol
-    stock = get_stock(branch_id, part.id)
-    if stock < qty:
-        messages.error(request, f"Stok yetersiz! Mevcut: {stock} / İstenen: {qty}")
+    if qty <= 0:
+        messages.error(request, "Adet > 0 olmalı.")
         return redirect("/workorders/")
 
-    # ✅ iş emri parça satırı oluştur
-    wop = WorkOrderPart.objects.create(order=order, part=part, qty=qty, unit_price=unit_price, line_total=qty * unit_price)
+    # ✅ stok kontrol + düş (OUT) tek koşullu UPDATE ile: eşzamanlı satışta eksiye düşmez
+    try:
+        move = consume_stock(branch_id, part, qty, workorder=order, note=f"WorkOrder #{order.id}")
+    except InsufficientStock as e:
+        messages.error(request, str(e))
+        return redirect("/workorders/")
 
-    # ✅ stok düş (OUT)
-    StockMove.objects.create(
-        branch_id=branch_id,
-        part=part,
-        move_type=StockMove.TYPE_OUT,
-        qty=qty,
-        unit_cost=part.cost_price or Decimal("0.00"),
-        note=f"WorkOrder #{order.id}",
-        workorder=order,
+    # ✅ iş emri parça satırı oluştur (maliyet: stok çıkışındaki birim maliyet)
+    WorkOrderPart.objects.create(
+        order=order, part=part, qty=qty, unit_price=unit_price, line_total=qty * unit_price, unit_cost=move.unit_cost,
     )
 
-    # ✅ totals güncelle
-    parts_total = sum((p.line_total for p in order.parts.all()), Decimal("0.00"))
-    order.parts_total = parts_total
-    order.grand_total = (order.labor_total or Decimal("0.00")) + parts_total
-    order.save()
+    # ✅ totals: WorkOrderPart signal'i DB tarafında günceller (recalc_totals)
 
     messages.success(request, "Parça eklendi ✅ Stok düşüldü ✅")
     return redirect("/workorders/")
+
+
+@login_required
+@transaction.atomic
+def remove_part_from_workorder(request, order_id: int, line_id: int):
+    """İş emrinden parça satırını kaldırır, stoğu iade eder (IN)."""
+    if request.method != "POST":
+        return redirect("/workorders/")
+
+    branch_id = request.session.get("active_branch_id")
+    if not branch_id:
+        messages.error(request, "Aktif şube seçili değil.")
+        return redirect("/workorders/")
+
+    order = get_object_or_404(WorkOrder, id=order_id, branch_id=branch_id)
+    # satırı kilitle: çift tıklamada iki kez iade olmasın
+    wop = get_object_or_404(WorkOrderPart.objects.select_for_update().select_related("part"), id=line_id, order=order)
+    wop.order = order
+
+    wop.delete()
+
+    # ✅ stok iadesi (IN, satırın maliyet snapshot'ı) + totals: WorkOrderPart post_delete signal'leri
+
+    messages.success(request, "Parça çıkarıldı ✅ Stok iade edildi ✅")
+    return redirect("/workorders/")
     
  
 @require_GET
@@ -270,7 +282,7 @@ def api_parts_search(request):
             models.Q(sku__icontains=q)
         )
 
-    qs = qs.order_by("name")[:30]
+    qs = with_stock(qs, branch_id).order_by("name")[:30]
 
     results = []
     for p in qs:
@@ -279,7 +291,7 @@ def api_parts_search(request):
             "text": f"{p.name} ({p.brand})" if p.brand else p.name,
             "barcode": p.barcode,
             "price": str(p.sale_price),
-            "stock": str(get_stock(branch_id, p.id)),
+            "stock": str(p.stock),
         })
 
     return JsonResponse({"results": results})
@@ -4,6 +4,7 @@ from .models import NotificationLog
 
 @admin.register(NotificationLog)
 class NotificationLogAdmin(admin.ModelAdmin):
-    list_display = ("id", "branch", "channel", "to", "status", "provider", "created_at")
+    list_display = ("id", "branch", "channel", "to", "status", "attempts", "next_attempt_at", "provider", "created_at")
     list_filter = ("branch", "channel", "status", "provider")
-    search_fields = ("to", "message", "error")
+    readonly_fields = ("dedupe_key",)
+    search_fields = ("to", "message", "error", "dedupe_key")
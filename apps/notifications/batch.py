@@ -0,0 +1,134 @@
+"""Toplu bildirim gonderimi: sinirli thread havuzu + provider basina token bucket.
+
+Thread'ler sadece HTTP cagrisini yapar; sonuclar ana thread'de NotificationLog'a
+islenir ve bulk_update ile yazilir. Devre kesici durumu cache'ten okundugu icin
+(DB cache backend'inde) thread'in actigi baglanti her gonderimden sonra kapatilir.
+Hiz siniri process icindir: ayni provider'a birden fazla worker gonderiyorsa
+NOTIFY_*_RATE degerlerini worker sayisina bolun.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connections
+
+from .models import NotificationLog
+from .outbox import RESULT_FIELDS, apply_result
+from .providers import CircuitBreaker, SendResult
+from .service import provider_for, send_now
+
+
+@dataclass
+class BatchReport:
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
+    @property
+    def total(self) -> int:
+        return self.sent + self.retried + self.failed
+
+    @property
+    def per_second(self) -> float:
+        return self.total / self.seconds if self.seconds else 0.0
+
+    def add(self, other: "BatchReport") -> None:
+        self.sent += other.sent
+        self.retried += other.retried
+        self.failed += other.failed
+        self.seconds += other.seconds
+
+    def __str__(self):
+        return (
+            f"gonderildi={self.sent} tekrar={self.retried} basarisiz={self.failed} "
+            f"sure={self.seconds:.2f}sn hiz={self.per_second:.1f}/sn"
+        )
+
+
+class TokenBucket:
+    """Saniyede `rate` jeton; en fazla `burst` birikir. acquire() jeton gelene kadar bekler."""
+
+    def __init__(self, rate: float, burst: int = 0):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1, int(rate)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def _rate(channel: str) -> float:
+    if channel == NotificationLog.CHANNEL_SMS:
+        return float(getattr(settings, "NOTIFY_SMS_RATE", 10))
+    return float(getattr(settings, "NOTIFY_WHATSAPP_RATE", 20))
+
+
+def get_bucket(channel: str, provider: str) -> TokenBucket:
+    key = f"{channel}:{provider}"
+    bucket = _buckets.get(key)
+    if bucket is None:
+        with _buckets_lock:
+            bucket = _buckets.get(key)
+            if bucket is None:
+                bucket = _buckets[key] = TokenBucket(_rate(channel))
+    return bucket
+
+
+def _send_one(log: NotificationLog):
+    try:
+        # Devre acikken provider'a gidilmeyecek: hiz sinirinda bekletme
+        if provider_for(log.channel).breaker.state() != CircuitBreaker.OPEN:
+            get_bucket(log.channel, log.provider).acquire()
+        return log, send_now(log)
+    except Exception as e:  # provider hatasi partiyi durdurmasin
+        return log, SendResult(ok=False, error=str(e), transient=True)
+    finally:
+        # Baglantilar thread'e ozel: havuz thread'inde acilan baglanti sizmasin
+        connections.close_all()
+
+
+def send_batch(logs, workers: int = 0) -> BatchReport:
+    """Kayitlari paralel gonderir, sonuclari bulk_update ile yazar."""
+    logs = list(logs)
+    report = BatchReport()
+    if not logs:
+        return report
+
+    workers = workers or int(getattr(settings, "NOTIFY_BATCH_WORKERS", 8))
+    started = time.monotonic()
+    done = []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(logs)))) as pool:
+        for log, res in pool.map(_send_one, logs):
+            status = apply_result(log, res)
+            if status == NotificationLog.STATUS_SENT:
+                report.sent += 1
+            elif status == NotificationLog.STATUS_FAILED:
+                report.failed += 1
+            else:
+                report.retried += 1
+            done.append(log)
+
+    NotificationLog.objects.bulk_update(done, RESULT_FIELDS, batch_size=500)
+    report.seconds = time.monotonic() - started
+    return report
@@ -0,0 +1,41 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.notifications.batch import BatchReport
+from apps.notifications.outbox import drain_once
+
+
+class Command(BaseCommand):
+    help = "Outbox'taki (PENDING) WhatsApp/SMS bildirimlerini gonderir; surekli calisan worker"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch", type=int, default=200, help="Tek seferde sahiplenilecek kayit")
+        parser.add_argument("--sleep", type=float, default=2.0, help="Kuyruk bosken bekleme (sn)")
+        parser.add_argument("--once", action="store_true", help="Kuyrugu bir kez bosaltip cik (cron)")
+
+    def handle(self, *args, **options):
+        batch = max(1, options["batch"])
+        self._stop = False
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+
+        total = BatchReport()
+        while not self._stop:
+            close_old_connections()
+            report = drain_once(batch)
+            total.add(report)
+            if report.total:
+                self.stdout.write(str(report))
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(f"OK: {total}"))
+
+    def _request_stop(self, signum, frame):
+        # Elindeki partiyi bitirip cik
+        self._stop = True
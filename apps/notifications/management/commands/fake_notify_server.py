@@ -0,0 +1,188 @@
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+WHATSAPP_PATH = re.compile(r"^/(?P<version>v[\d.]+)/(?P<phone_number_id>[^/]+)/messages/?$")
+SMS_PATH = "/sms/send"
+
+
+class FakeBehavior:
+    """Sunucu davranisi (gecikme, hata orani, 429 patlamalari) + sayaclar; thread-safe."""
+
+    def __init__(self, latency_ms, jitter_ms, error_rate, throttle_rate, burst_every, burst_size,
+                 hang_rate, hang_seconds, retry_after):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.burst_every = burst_every
+        self.burst_size = burst_size
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.retry_after = retry_after
+
+        self._lock = threading.Lock()
+        self._seq = 0
+        self.counts = {"requests": 0, "ok": 0, "429": 0, "500": 0, "hang": 0, "bad_request": 0}
+
+    def count(self, key):
+        with self._lock:
+            self.counts[key] += 1
+
+    def next_outcome(self) -> str:
+        """ok / 429 / 500 / hang"""
+        with self._lock:
+            self._seq += 1
+            self.counts["requests"] += 1
+            seq = self._seq
+        # Her `burst_every` istekte bir, ardisik `burst_size` istek 429 (Meta hiz siniri patlamasi)
+        if self.burst_every and (seq - 1) % self.burst_every < self.burst_size:
+            return "429"
+        roll = random.random()
+        if roll < self.hang_rate:
+            return "hang"
+        roll -= self.hang_rate
+        if roll < self.throttle_rate:
+            return "429"
+        roll -= self.throttle_rate
+        if roll < self.error_rate:
+            return "500"
+        return "ok"
+
+    def sleep(self):
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.counts)
+
+
+def make_handler(behavior: FakeBehavior, verbose: bool):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive (pooled session testleri)
+
+        def log_message(self, fmt, *args):
+            if verbose:
+                super().log_message(fmt, *args)
+
+        def _json(self, status: int, data: dict, headers=None):
+            body = json.dumps(data).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_json(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b""
+            try:
+                return json.loads(raw or b"{}")
+            except ValueError:
+                return None
+
+        def do_GET(self):
+            if self.path.rstrip("/") == "/stats":
+                return self._json(200, behavior.snapshot())
+            return self._json(404, {"error": {"message": "not found"}})
+
+        def do_POST(self):
+            payload = self._read_json()
+            wa = WHATSAPP_PATH.match(self.path)
+            if not wa and self.path.rstrip("/") != SMS_PATH:
+                return self._json(404, {"error": {"message": "not found"}})
+            if not (self.headers.get("Authorization") or "").startswith("Bearer "):
+                behavior.count("bad_request")
+                return self._json(401, {"error": {"message": "missing token", "code": 190}})
+            to = (payload or {}).get("to")
+            if not to or (wa and (payload.get("messaging_product") != "whatsapp" or payload.get("type") != "text")):
+                behavior.count("bad_request")
+                return self._json(400, {"error": {"message": "invalid payload", "code": 100}})
+
+            outcome = behavior.next_outcome()
+            if outcome == "hang":
+                behavior.count("hang")
+                time.sleep(behavior.hang_seconds)
+            else:
+                behavior.sleep()
+
+            if outcome == "429":
+                behavior.count("429")
+                return self._json(
+                    429,
+                    {"error": {"message": "(#80007) Rate limit hit", "code": 80007}},
+                    headers={"Retry-After": str(behavior.retry_after)},
+                )
+            if outcome == "500":
+                behavior.count("500")
+                return self._json(500, {"error": {"message": "Service temporarily unavailable", "code": 2}})
+
+            behavior.count("ok")
+            if wa:
+                return self._json(200, {
+                    "messaging_product": "whatsapp",
+                    "contacts": [{"input": to, "wa_id": to}],
+                    "messages": [{"id": f"wamid.FAKE{uuid.uuid4().hex}"}],
+                })
+            return self._json(200, {"id": f"sms-{uuid.uuid4().hex[:16]}", "status": "queued"})
+
+    return Handler
+
+
+class Command(BaseCommand):
+    help = (
+        "Yuk testi icin sahte WhatsApp Cloud API + generic SMS sunucusu. "
+        "POST /{version}/{phone_number_id}/messages, POST /sms/send, GET /stats. "
+        "Uygulamayi yonlendirmek icin: NOTIFY_FAKE_SERVER_URL=http://host:port"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8025)
+        parser.add_argument("--latency-ms", type=float, default=120, help="Ortalama yanit gecikmesi")
+        parser.add_argument("--jitter-ms", type=float, default=40, help="Gecikmeye +- rastgele sapma")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="HTTP 500 olasiligi (0-1)")
+        parser.add_argument("--throttle-rate", type=float, default=0.0, help="Rastgele 429 olasiligi (0-1)")
+        parser.add_argument("--burst-every", type=int, default=0, help="Her N istekte bir 429 patlamasi (0=kapali)")
+        parser.add_argument("--burst-size", type=int, default=0, help="Patlamadaki ardisik 429 sayisi")
+        parser.add_argument("--hang-rate", type=float, default=0.0, help="Yanit vermeden bekleme olasiligi (timeout)")
+        parser.add_argument("--hang-seconds", type=float, default=30, help="Bekleme suresi (client timeout'tan uzun)")
+        parser.add_argument("--retry-after", type=int, default=1, help="429 yanitindaki Retry-After (sn)")
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument("--verbose", action="store_true", help="Her istegi logla")
+
+    def handle(self, *args, **options):
+        if options["seed"] is not None:
+            random.seed(options["seed"])
+        behavior = FakeBehavior(
+            latency_ms=options["latency_ms"],
+            jitter_ms=options["jitter_ms"],
+            error_rate=options["error_rate"],
+            throttle_rate=options["throttle_rate"],
+            burst_every=options["burst_every"],
+            burst_size=options["burst_size"],
+            hang_rate=options["hang_rate"],
+            hang_seconds=options["hang_seconds"],
+            retry_after=options["retry_after"],
+        )
+        server = ThreadingHTTPServer((options["host"], options["port"]), make_handler(behavior, options["verbose"]))
+        server.daemon_threads = True
+        host, port = server.server_address[:2]
+        self.stdout.write(f"Fake notify server: http://{host}:{port}  (NOTIFY_FAKE_SERVER_URL=http://{host}:{port})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(self.style.SUCCESS(f"OK: {behavior.snapshot()}"))
@@ -11,5 +11,5 @@ class Command(BaseCommand):
 
     def handle(self, *args, **options):
         days = options.get("days") or 7
-        due_tirehotel_reminders(days_ahead=days)
-        self.stdout.write(self.style.SUCCESS(f"OK: due reminders checked (days={days})"))
+        report = due_tirehotel_reminders(days_ahead=days)
+        self.stdout.write(self.style.SUCCESS(f"OK: due reminders checked (days={days}) {report}"))
@@ -22,7 +22,20 @@ class NotificationLog(models.Model):
     provider_message_id = models.CharField(max_length=120, blank=True)
     error = models.TextField(blank=True)
 
+    # Tekrar gonderim engeli: orn. "workorder:12:done", "tire:5:due:2026-10-20"
+    dedupe_key = models.CharField(max_length=120, unique=True, null=True, blank=True)
+
+    # Outbox: PENDING kayitlari drain_notifications worker'i gonderir
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),
+        ]
+
     def __str__(self):
         return f"{self.channel} -> {self.to} ({self.status})"
@@ -0,0 +1,84 @@
+"""Bildirim outbox'i: PENDING NotificationLog kayitlarini teslim eder.
+
+Triggers kaydi istek transaction'i icinde yazar (service.enqueue); burada
+drain_notifications worker'i kayitlari sahiplenir (claim), provider'a gonderir
+ve sonucu isler. Gecici hata (timeout, 429/5xx) alan kayit ustel bekleme ile
+tekrar denenir; NOTIFY_MAX_ATTEMPTS asilinca veya kalici hatada FAILED olur.
+Devre kesici acikken kayit deneme sayilmadan ertelenir.
+
+Sahiplenme: kayitlarin next_attempt_at'i NOTIFY_CLAIM_SECONDS ileri alinir;
+worker gonderim sirasinda olurse kayit bu sure sonunda tekrar alinir.
+Postgres'te SKIP LOCKED ile birden fazla worker ayni kaydi almaz.
+"""
+
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import NotificationLog
+
+
+def _setting(name: str, default: int) -> int:
+    return int(getattr(settings, name, default))
+
+
+def backoff_delay(attempts: int) -> timedelta:
+    """attempts. denemeden sonra bekleme: base * 2^(n-1), ust sinirli, +-%20 jitter."""
+    base = _setting("NOTIFY_RETRY_BASE_SECONDS", 30)
+    cap = _setting("NOTIFY_RETRY_MAX_SECONDS", 3600)
+    seconds = min(cap, base * (2 ** max(0, attempts - 1)))
+    return timedelta(seconds=seconds * random.uniform(0.8, 1.2))
+
+
+def claim_batch(limit: int = 50) -> list:
+    """Zamani gelen PENDING kayitlari sahiplenir (kisa transaction)."""
+    now = timezone.now()
+    with transaction.atomic():
+        logs = list(
+            NotificationLog.objects.select_for_update(skip_locked=True)
+            .filter(status=NotificationLog.STATUS_PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")[:limit]
+        )
+        if logs:
+            NotificationLog.objects.filter(pk__in=[x.pk for x in logs]).update(
+                next_attempt_at=now + timedelta(seconds=_setting("NOTIFY_CLAIM_SECONDS", 300))
+            )
+    return logs
+
+
+def apply_result(log: NotificationLog, res, now=None) -> str:
+    """SendResult'i kayda isler (kaydetmez); yeni status'u dondurur."""
+    now = now or timezone.now()
+    if res.circuit_open:
+        # Provider'a gidilmedi: deneme sayilmaz, devre kapanacagi zamana ertelenir
+        log.error = res.error
+        log.next_attempt_at = now + timedelta(seconds=float(getattr(settings, "NOTIFY_CB_OPEN_SECONDS", 60)))
+        return log.status
+    log.attempts += 1
+    if res.ok:
+        log.status = NotificationLog.STATUS_SENT
+        log.provider_message_id = res.message_id
+        log.error = ""
+        log.sent_at = now
+        log.next_attempt_at = None
+    elif not res.transient or log.attempts >= _setting("NOTIFY_MAX_ATTEMPTS", 6):
+        log.status = NotificationLog.STATUS_FAILED
+        log.error = res.error
+        log.next_attempt_at = None
+    else:
+        log.error = res.error
+        log.next_attempt_at = now + backoff_delay(log.attempts)
+    return log.status
+
+
+RESULT_FIELDS = ["status", "provider_message_id", "error", "attempts", "sent_at", "next_attempt_at"]
+
+
+def drain_once(limit: int = 50):
+    """Bir parti: sahiplen + toplu gonder (batch.send_batch). Bos partide total == 0."""
+    from .batch import send_batch
+
+    return send_batch(claim_batch(limit))
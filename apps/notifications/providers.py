@@ -4,13 +4,22 @@ WhatsApp: Resmi API (Meta WhatsApp Cloud API) icin iskelet
 SMS: Provider'a gore degisecek generic iskelet
 
 Uretimde: requests ile API'ye cagrilar atilir. Burada sadece arayuz + ornek payloadlari var.
+Provider'lar process basina tekildir (get_*_provider), havuzlu bir Session paylasir
+ve devre kesici (CircuitBreaker) ile sarilir.
 """
 
+import itertools
+import threading
+import time
 from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
 from typing import Optional
 
 from django.conf import settings
+from django.core.cache import cache
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 @dataclass
@@ -18,6 +27,73 @@ class SendResult:
     ok: bool
     message_id: str = ""
     error: str = ""
+    # Gecici hata (timeout, baglanti, 429/5xx): tekrar denenir, devre kesiciyi besler
+    transient: bool = False
+    # Devre acik: provider'a hic gidilmedi
+    circuit_open: bool = False
+
+
+def build_session() -> requests.Session:
+    """Keep-alive baglanti havuzlu Session.
+
+    Tekrar deneme sadece mesajin provider'a ulasmadigi kesin durumlarda yapilir:
+    baglanti kurulamadi (connect) veya 429 (Retry-After'a uyularak). Read timeout
+    ve 5xx'te POST zaten teslim edilmis olabilir -> burada tekrar gonderilmez;
+    outbox backoff'u + devre kesici ele alir, dedupe_key mukerreri engeller.
+
+    Provider basina bir tane olusturulur ve thread'ler arasinda paylasilir
+    (istek basina header verilir, session state'i degistirilmez).
+    """
+    retries = int(getattr(settings, "NOTIFY_HTTP_RETRIES", 3))
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=0,
+        other=0,
+        status=retries,
+        backoff_factor=float(getattr(settings, "NOTIFY_HTTP_BACKOFF", 0.5)),
+        status_forcelist=(429,),
+        allowed_methods=frozenset({"GET", "POST"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    pool = int(getattr(settings, "NOTIFY_HTTP_POOL_SIZE", 20))
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool, pool_block=True, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def http_timeout() -> tuple:
+    return (
+        float(getattr(settings, "NOTIFY_HTTP_CONNECT_TIMEOUT", 5)),
+        float(getattr(settings, "NOTIFY_HTTP_READ_TIMEOUT", 15)),
+    )
+
+
+def is_transient_status(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+class HttpProviderMixin:
+    """Provider instance'i process icinde tekil; session ilk kullanimda kurulur."""
+
+    _session: Optional[requests.Session] = None
+    _session_lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = build_session()
+        return self._session
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._session = None
 
 
 class WhatsAppProvider:
@@ -34,7 +110,7 @@ class SmsProvider:
         raise NotImplementedError
 
 
-class MetaWhatsAppCloudProvider(WhatsAppProvider):
+class MetaWhatsAppCloudProvider(HttpProviderMixin, WhatsAppProvider):
     name = "meta_cloud"
 
     def send_text(self, to_e164: str, text: str) -> SendResult:
@@ -49,7 +125,8 @@ class MetaWhatsAppCloudProvider(WhatsAppProvider):
         if not token or not phone_number_id:
             return SendResult(ok=False, error="WHATSAPP_TOKEN veya WHATSAPP_PHONE_NUMBER_ID eksik")
 
-        url = f"https://graph.facebook.com/{version}/{phone_number_id}/messages"
+        base_url = getattr(settings, "WHATSAPP_API_BASE_URL", "https://graph.facebook.com").rstrip("/")
+        url = f"{base_url}/{version}/{phone_number_id}/messages"
         payload = {
             "messaging_product": "whatsapp",
             "to": to_e164.replace("+", ""),
@@ -58,11 +135,11 @@ class MetaWhatsAppCloudProvider(WhatsAppProvider):
         }
 
         try:
-            resp = requests.post(
+            resp = self.session.post(
                 url,
                 json=payload,
                 headers={"Authorization": f"Bearer {token}"},
-                timeout=15,
+                timeout=http_timeout(),
             )
             if resp.status_code >= 200 and resp.status_code < 300:
                 data = resp.json() if resp.content else {}
@@ -73,27 +150,210 @@ class MetaWhatsAppCloudProvider(WhatsAppProvider):
                 except Exception:
                     msg_id = ""
                 return SendResult(ok=True, message_id=msg_id)
-            return SendResult(ok=False, error=f"HTTP {resp.status_code}: {resp.text[:200]}")
+            return SendResult(
+                ok=False, error=f"HTTP {resp.status_code}: {resp.text[:200]}", transient=is_transient_status(resp.status_code)
+            )
         except Exception as e:
-            return SendResult(ok=False, error=str(e))
+            return SendResult(ok=False, error=str(e), transient=True)
 
 
-class GenericSmsProvider(SmsProvider):
+class GenericSmsProvider(HttpProviderMixin, SmsProvider):
     name = "generic"
 
     def send_text(self, to_e164: str, text: str) -> SendResult:
+        """SMS_API_URL'e JSON POST: {to, text, sender} -> {id}.
+
+        Gercek SMS firmasinin sozlesmesine gore uyarlanmali; fake_notify_server ayni sozlesmeyi konusur.
+        """
         if not settings.SMS_API_KEY:
             return SendResult(ok=False, error="SMS_API_KEY eksik")
-        return SendResult(ok=False, error="Provider iskeleti: SMS API cagrisi eklenmedi")
+        url = getattr(settings, "SMS_API_URL", "")
+        if not url:
+            return SendResult(ok=False, error="Provider iskeleti: SMS API cagrisi eklenmedi")
+
+        try:
+            resp = self.session.post(
+                url,
+                json={"to": to_e164, "text": text, "sender": getattr(settings, "SMS_SENDER", "")},
+                headers={"Authorization": f"Bearer {settings.SMS_API_KEY}"},
+                timeout=http_timeout(),
+            )
+            if 200 <= resp.status_code < 300:
+                data = resp.json() if resp.content else {}
+                return SendResult(ok=True, message_id=str(data.get("id") or ""))
+            return SendResult(
+                ok=False, error=f"HTTP {resp.status_code}: {resp.text[:200]}", transient=is_transient_status(resp.status_code)
+            )
+        except Exception as e:
+            return SendResult(ok=False, error=str(e), transient=True)
+
+
+class FakeProvider(WhatsAppProvider, SmsProvider):
+    """Ag kullanmayan sahte provider (NOTIFY_*_PROVIDER=fake): yuk / batch testleri icin.
+
+    NOTIFY_FAKE_LATENCY_MS kadar bekler, her mesaji basarili sayar.
+    """
+
+    name = "fake"
+
+    def __init__(self):
+        self.latency = float(getattr(settings, "NOTIFY_FAKE_LATENCY_MS", 50)) / 1000
+        self._counter = itertools.count(1)
+
+    def send_text(self, to_e164: str, text: str) -> SendResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return SendResult(ok=True, message_id=f"fake.{next(self._counter)}")
+
+
+class CircuitBreaker:
+    """Provider basina devre kesici; durum Django cache'inde (worker'lar arasi ortak).
+
+    CLOSED: normal. Ardisik NOTIFY_CB_FAILURES gecici hatada OPEN olur ve
+    NOTIFY_CB_OPEN_SECONDS boyunca istekler provider'a gitmeden reddedilir.
+    Sure dolunca HALF_OPEN: tek bir deneme istegine izin verilir; basariliysa
+    CLOSED, degilse tekrar OPEN.
+    """
+
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+    def __init__(self, key: str):
+        self.key = key
+
+    def _k(self, part: str) -> str:
+        return f"notify:cb:{self.key}:{part}"
+
+    @staticmethod
+    def threshold() -> int:
+        return int(getattr(settings, "NOTIFY_CB_FAILURES", 5))
+
+    @staticmethod
+    def open_seconds() -> float:
+        return float(getattr(settings, "NOTIFY_CB_OPEN_SECONDS", 60))
+
+    def state(self) -> str:
+        open_until = cache.get(self._k("open_until"))
+        if not open_until:
+            return self.CLOSED
+        return self.OPEN if time.time() < open_until else self.HALF_OPEN
+
+    def allow(self) -> bool:
+        open_until = cache.get(self._k("open_until"))
+        if not open_until:
+            return True
+        if time.time() < open_until:
+            return False
+        # Half-open: sadece bir deneme (add atomik); deneme takilirsa timeout sonra yenisi
+        probe_timeout = int(getattr(settings, "NOTIFY_HTTP_READ_TIMEOUT", 15)) + 5
+        return cache.add(self._k("probe"), 1, timeout=probe_timeout)
+
+    def record_success(self) -> None:
+        cache.delete_many([self._k("failures"), self._k("open_until"), self._k("probe")])
+
+    def record_failure(self, error: str = "") -> None:
+        cache.set(self._k("last_error"), (error or "")[:300], None)
+        cache.add(self._k("failures"), 0, None)
+        try:
+            failures = cache.incr(self._k("failures"))
+        except ValueError:  # anahtar arada silindi
+            failures = 1
+        if failures >= self.threshold() or cache.get(self._k("open_until")):
+            self.trip()
+
+    def trip(self) -> None:
+        cache.set(self._k("open_until"), time.time() + self.open_seconds(), None)
+        cache.delete(self._k("probe"))
+
+    def reset(self) -> None:
+        cache.delete_many([self._k(p) for p in ("failures", "open_until", "probe", "last_error")])
+
+    def status(self) -> dict:
+        open_until = cache.get(self._k("open_until"))
+        return {
+            "key": self.key,
+            "state": self.state(),
+            "failures": cache.get(self._k("failures")) or 0,
+            "open_until": datetime.fromtimestamp(open_until, tz=dt_timezone.utc) if open_until else None,
+            "last_error": cache.get(self._k("last_error")) or "",
+        }
+
+
+class GuardedProvider:
+    """Provider'i devre kesici ile sarar; devre acikken hemen circuit_open sonucu doner."""
+
+    def __init__(self, provider, breaker: CircuitBreaker):
+        self.provider = provider
+        self.breaker = breaker
+
+    @property
+    def name(self) -> str:
+        return self.provider.name
+
+    def send_text(self, to_e164: str, text: str) -> SendResult:
+        if not self.breaker.allow():
+            return SendResult(
+                ok=False, error=f"Devre acik ({self.breaker.key}): tekrar kuyruga alindi",
+                transient=True, circuit_open=True,
+            )
+        res = self.provider.send_text(to_e164, text)
+        if res.ok or not res.transient:
+            # Provider cevap verdi (4xx dahil): servis ayakta
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure(res.error)
+        return res
+
+    def close(self) -> None:
+        if hasattr(self.provider, "close"):
+            self.provider.close()
+
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def _singleton(key: str, factory):
+    provider = _providers.get(key)
+    if provider is None:
+        with _providers_lock:
+            provider = _providers.get(key)
+            if provider is None:
+                provider = _providers[key] = GuardedProvider(factory(), CircuitBreaker(key))
+    return provider
+
+
+def provider_keys() -> list:
+    """Ayarlardaki aktif provider anahtarlari (devre kesici / durum sayfasi)."""
+    return [
+        f"whatsapp:{getattr(settings, 'NOTIFY_WHATSAPP_PROVIDER', 'meta_cloud')}",
+        f"sms:{getattr(settings, 'NOTIFY_SMS_PROVIDER', 'generic')}",
+    ]
+
+
+def reset_providers() -> None:
+    """Ayar degisince (testler / fake sunucu) provider'lari ve session'lari yeniden kur."""
+    with _providers_lock:
+        for provider in _providers.values():
+            if hasattr(provider, "close"):
+                provider.close()
+        _providers.clear()
 
 
-def get_whatsapp_provider() -> WhatsAppProvider:
-    if getattr(settings, "NOTIFY_WHATSAPP_PROVIDER", "meta_cloud") == "meta_cloud":
-        return MetaWhatsAppCloudProvider()
-    return MetaWhatsAppCloudProvider()
+def get_whatsapp_provider() -> GuardedProvider:
+    name = getattr(settings, "NOTIFY_WHATSAPP_PROVIDER", "meta_cloud")
+    if name == "fake":
+        return _singleton("whatsapp:fake", FakeProvider)
+    if name == "meta_cloud":
+        return _singleton("whatsapp:meta_cloud", MetaWhatsAppCloudProvider)
+    return _singleton("whatsapp:meta_cloud", MetaWhatsAppCloudProvider)
 
 
-def get_sms_provider() -> SmsProvider:
-    if getattr(settings, "NOTIFY_SMS_PROVIDER", "generic") == "generic":
-        return GenericSmsProvider()
-    return GenericSmsProvider()
+def get_sms_provider() -> GuardedProvider:
+    name = getattr(settings, "NOTIFY_SMS_PROVIDER", "generic")
+    if name == "fake":
+        return _singleton("sms:fake", FakeProvider)
+    if name == "generic":
+        return _singleton("sms:generic", GenericSmsProvider)
+    return _singleton("sms:generic", GenericSmsProvider)
@@ -1,5 +1,9 @@
+from datetime import timedelta
+
 from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.db.utils import OperationalError
+from django.utils import timezone
 
 from .models import NotificationLog
 from .providers import get_sms_provider, get_whatsapp_provider
@@ -7,12 +11,27 @@ from typing import Optional
 
 
 
-def _try_create_log(**kwargs):
-    """Create NotificationLog if table exists; if not, return None."""
+def insert_log(log: NotificationLog):
+    """(log, created). Ayni dedupe_key zaten varsa (mevcut kayit, False).
+
+    Kendi savepoint'i icinde: cagiranin transaction'i (outbox) bozulmaz.
+    Tablo yoksa (None, False).
+    """
     try:
-        return NotificationLog.objects.create(**kwargs)
+        with transaction.atomic():
+            log.save()
+            return log, True
+    except IntegrityError:
+        if not log.dedupe_key:
+            raise
+        return NotificationLog.objects.filter(dedupe_key=log.dedupe_key).first(), False
     except OperationalError:
-        return None
+        return None, False
+
+
+def _try_save_log(log: NotificationLog):
+    """Save NotificationLog if table exists; if not, return None."""
+    return insert_log(log)[0]
 
 
 def _try_update_log(log: NotificationLog | None, **fields):
@@ -27,42 +46,106 @@ def _try_update_log(log: NotificationLog | None, **fields):
         return
 
 
-def send_sms(branch_id: int, to_e164: str, message: str):
-    """Send SMS and (if possible) store a NotificationLog."""
-    log = _try_create_log(
+def _provider_name(channel: str) -> str:
+    if channel == NotificationLog.CHANNEL_SMS:
+        return getattr(settings, "NOTIFY_SMS_PROVIDER", "generic")
+    return getattr(settings, "NOTIFY_WHATSAPP_PROVIDER", "meta_cloud")
+
+
+def provider_for(channel: str):
+    if channel == NotificationLog.CHANNEL_SMS:
+        return get_sms_provider()
+    return get_whatsapp_provider()
+
+
+def send_now(log: NotificationLog):
+    """Tek kaydi provider'a iletir; SendResult dondurur (log'u guncellemez)."""
+    return provider_for(log.channel).send_text(log.to, log.message)
+
+
+# -------------------------
+# Outbox (istek icinde gonderim yok)
+# -------------------------
+def new_log(
+    branch_id: int, channel: str, to: str, message: str, next_attempt_at=None, idempotency_key: str = ""
+) -> NotificationLog:
+    """Kaydedilmemis PENDING kayit (toplu bulk_create icin)."""
+    return NotificationLog(
         branch_id=branch_id,
-        channel=NotificationLog.CHANNEL_SMS,
-        to=to_e164,
+        channel=channel,
+        to=to,
         message=message,
-        provider=getattr(settings, "NOTIFY_SMS_PROVIDER", "generic"),
+        provider=_provider_name(channel),
+        next_attempt_at=next_attempt_at or timezone.now(),
+        dedupe_key=idempotency_key or None,
     )
 
-    res = get_sms_provider().send_text(to_e164, message)
-    if res.ok:
-        _try_update_log(log, status=NotificationLog.STATUS_SENT, provider_message_id=res.message_id, error="")
-    else:
-        _try_update_log(log, status=NotificationLog.STATUS_FAILED, error=res.error)
 
+def enqueue(
+    branch_id: int, channel: str, to: str, message: str, idempotency_key: str = ""
+) -> Optional[NotificationLog]:
+    """PENDING kayit yazar; cagiranin transaction'i ile birlikte commit edilir.
+
+    Gonderimi drain_notifications worker'i yapar -> istek suresi provider'dan bagimsiz.
+    idempotency_key daha once kullanildiysa yeni kayit acilmaz, mevcut kayit doner.
+    """
+    return _try_save_log(new_log(branch_id, channel, to, message, idempotency_key=idempotency_key))
+
+
+def enqueue_whatsapp(branch_id: int, to: str, message: str, idempotency_key: str = "") -> Optional[NotificationLog]:
+    return enqueue(branch_id, NotificationLog.CHANNEL_WHATSAPP, to, message, idempotency_key=idempotency_key)
+
+
+def enqueue_sms(branch_id: int, to: str, message: str, idempotency_key: str = "") -> Optional[NotificationLog]:
+    return enqueue(branch_id, NotificationLog.CHANNEL_SMS, to, message, idempotency_key=idempotency_key)
+
+
+# -------------------------
+# Aninda gonderim (test sayfasi)
+# -------------------------
+def _send_logged(branch_id: int, channel: str, to: str, message: str, idempotency_key: str = ""):
+    log, created = insert_log(
+        NotificationLog(
+            branch_id=branch_id,
+            channel=channel,
+            to=to,
+            message=message,
+            provider=_provider_name(channel),
+            dedupe_key=idempotency_key or None,
+        )
+    )
+    if log and not created:
+        # Ayni anahtarla daha once gonderildi / kuyrukta: provider'a gitme
+        return log
+    res = send_now(log or NotificationLog(channel=channel, to=to, message=message))
+    now = timezone.now()
+    if res.circuit_open:
+        # Devre acik: outbox'a birak, worker devre kapaninca gonderir
+        retry_at = now + timedelta(seconds=float(getattr(settings, "NOTIFY_CB_OPEN_SECONDS", 60)))
+        _try_update_log(log, error=res.error, next_attempt_at=retry_at)
+    elif res.ok:
+        _try_update_log(
+            log, status=NotificationLog.STATUS_SENT, provider_message_id=res.message_id, error="",
+            attempts=1, sent_at=now,
+        )
+    else:
+        _try_update_log(log, status=NotificationLog.STATUS_FAILED, error=res.error, attempts=1)
     return log
 
 
-def send_whatsapp(branch_id: int, to: str, message: str, template_key: Optional[str] = None) -> bool:
-    """
-    Backward/forward compatible wrapper.
-    triggers.py artık send_whatsapp(branch_id, to=..., message=...) kullanabilir.
+def send_sms(branch_id: int, to_e164: str, message: str, idempotency_key: str = ""):
+    """Send SMS and (if possible) store a NotificationLog.
+
+    idempotency_key (orn. "workorder:12:done") daha once kullanildiysa tekrar gonderilmez.
     """
-    provider = get_whatsapp_provider()
-    if not provider:
-        return False
+    return _send_logged(branch_id, NotificationLog.CHANNEL_SMS, to_e164, message, idempotency_key)
 
-    # Provider imzaları farklı olabilir -> güvenli çağrı
-    try:
-        # bazı provider'lar (to, message) bekler
-        return provider.send(to=to, message=message, template_key=template_key)
-    except TypeError:
-        try:
-            # bazı provider'lar (phone, text) bekler
-            return provider.send(phone=to, text=message)
-        except TypeError:
-            # bazı provider'lar (to_phone, body) bekler
-            return provider.send(to_phone=to, body=message)
\ No newline at end of file
+
+def send_whatsapp(
+    branch_id: int, to: str, message: str, template_key: Optional[str] = None, idempotency_key: str = ""
+):
+    """WhatsApp'i hemen gonderir (NotificationLog ile). Otomatik bildirimler enqueue_whatsapp kullanir.
+
+    idempotency_key daha once kullanildiysa provider'a gidilmez, mevcut kayit doner.
+    """
+    return _send_logged(branch_id, NotificationLog.CHANNEL_WHATSAPP, to, message, idempotency_key)
@@ -1,15 +1,33 @@
+import logging
 from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
 from django.utils import timezone
 
 from apps.workorders.models import WorkOrder
-from apps.tirehotel.models import TireHotelEntry
+from apps.tirehotel.models import TireHotelEntry, TireReminder
 
-from .service import send_whatsapp
+from .batch import send_batch
+from .models import NotificationLog
+from .service import enqueue_whatsapp, insert_log, new_log
 from .utils import to_e164_tr
 
+logger = logging.getLogger(__name__)
+
+
+def notify_safely(trigger, obj) -> None:
+    """Bildirimi kendi savepoint'inde kuyruga yazar; hata (DB dahil) loglanir,
+    cagiranin is kaydi / transaction'i etkilenmez."""
+    try:
+        with transaction.atomic():
+            trigger(obj)
+    except Exception:
+        logger.exception("bildirim kuyruga yazilamadi: %s #%s", trigger.__name__, obj.pk)
+
 
 def on_workorder_done(order: WorkOrder) -> None:
-    """Is emri Teslim olunca otomatik WhatsApp bildirimi."""
+    """Is emri Teslim olunca otomatik WhatsApp bildirimi (outbox'a yazilir)."""
     customer = order.customer
     if not customer or not customer.phone:
         return
@@ -25,38 +43,100 @@ def on_workorder_done(order: WorkOrder) -> None:
         f"Toplam: {order.grand_total} TL\n"
         f"Tarih: {timezone.localtime(order.updated_at).strftime('%d.%m.%Y %H:%M')}"
     )
-    send_whatsapp(order.branch_id, to, msg)
+    enqueue_whatsapp(order.branch_id, to, msg, idempotency_key=f"workorder:{order.pk}:done")
+
+
+def _reminder_windows(today, days_ahead: int):
+    """(asama, ilk due_at, son due_at): her asama kendi due_at araliginda secilir."""
+    lookback = int(getattr(settings, "TIREHOTEL_OVERDUE_LOOKBACK_DAYS", 30))
+    return [
+        (TireReminder.STAGE_T7, today + timedelta(days=2), today + timedelta(days=days_ahead)),
+        (TireReminder.STAGE_T1, today, today + timedelta(days=1)),
+        (TireReminder.STAGE_OVERDUE, today - timedelta(days=lookback), today - timedelta(days=1)),
+    ]
+
+
+def _reminder_text(stage: str, c, plate: str, x) -> str:
+    if stage == TireReminder.STAGE_OVERDUE:
+        head = "Lastik otel kaydinizin son tarihi gecti ⚠️"
+    elif stage == TireReminder.STAGE_T1:
+        head = "Lastik otel kaydiniz icin son gun yaklasti 🔔"
+    else:
+        head = "Lastik otel kaydiniz icin hatirlatma 🔔"
+    return (
+        f"Merhaba {c.full_name}.\n"
+        f"{head}\n"
+        f"Plaka: {plate}\n"
+        f"Konum: Depo1 {x.rack_code}/{x.slot_code}\n"
+        f"Son tarih: {x.due_at.strftime('%d.%m.%Y')}"
+    )
 
 
 def due_tirehotel_reminders(days_ahead: int = 7):
-    """Lastik otel due_at yaklasan kayitlar icin WhatsApp hatirlatma.
+    """Lastik otel due_at yaklasan / gecen kayitlar icin WhatsApp hatirlatma (T-7, T-1, gecikmis).
 
     Bu fonksiyon cron/management command ile gunluk calistirilmak icin tasarlandi.
+    Sadece yeni bir esigi gecen kayitlar secilir (TireReminder defterinde satiri olmayanlar);
+    (is_active, due_at) index'i + defterin unique index'i ile calisma suresi depo
+    buyuklugune degil yeni hatirlatma sayisina baglidir.
+    Mesajlar outbox'a toplu yazilir ve batch.send_batch ile paralel gonderilir;
+    basarisizlar drain_notifications worker'inda tekrar denenir. BatchReport dondurur.
     """
     today = timezone.localdate()
-    until = today + timedelta(days=days_ahead)
-    qs = (
-        TireHotelEntry.objects.filter(is_active=True, due_at__isnull=False, due_at__range=(today, until))
-        .select_related("customer")
-        .order_by("due_at")
-    )
-    for x in qs:
-        c = x.customer
-        if not c or not c.phone:
-            continue
-        to = to_e164_tr(c.phone)
-        if not to:
+    # Worker bu kayitlari hemen almasin (once bu calisma gonderir)
+    hold = timezone.now() + timedelta(seconds=int(getattr(settings, "NOTIFY_CLAIM_SECONDS", 300)))
+    logs = []
+    ledger = []
+    for stage, first, last in _reminder_windows(today, days_ahead):
+        if first > last:
             continue
-
-        plate = x.plate_text or (x.vehicle.plate if x.vehicle else "-")
-        msg = (
-            f"Merhaba {c.full_name}.\n"
-            f"Lastik otel kaydiniz icin hatirlatma 🔔\n"
-            f"Plaka: {plate}\n"
-            f"Konum: Depo1 {x.rack_code}/{x.slot_code}\n"
-            f"Son tarih: {x.due_at.strftime('%d.%m.%Y')}"
+        done = TireReminder.objects.filter(entry=OuterRef("pk"), stage=stage, due_at=OuterRef("due_at"))
+        qs = (
+            TireHotelEntry.objects.filter(is_active=True, due_at__range=(first, last))
+            .filter(~Exists(done))
+            .select_related("customer", "vehicle")
+            .order_by("due_at", "id")
         )
-        send_whatsapp(x.branch_id, to, msg)
+        for x in qs:
+            reminder = TireReminder(entry=x, stage=stage, due_at=x.due_at)
+            ledger.append(reminder)
+            c = x.customer
+            to = to_e164_tr(c.phone) if c and c.phone else ""
+            if not to:
+                continue
+
+            plate = x.plate_text or (x.vehicle.plate if x.vehicle else "-")
+            reminder.dedupe_key = f"tire:{x.pk}:due:{x.due_at.isoformat()}:{stage.lower()}"
+            logs.append(new_log(
+                x.branch_id, NotificationLog.CHANNEL_WHATSAPP, to, _reminder_text(stage, c, plate, x),
+                next_attempt_at=hold, idempotency_key=reminder.dedupe_key,
+            ))
+
+    with transaction.atomic():
+        # Ayni anahtarla daha once yazildiysa atla (cron tekrar calissa da)
+        keys = [log.dedupe_key for log in logs]
+        seen = set(NotificationLog.objects.filter(dedupe_key__in=keys).values_list("dedupe_key", flat=True))
+        fresh = [log for log in logs if log.dedupe_key not in seen]
+        by_key = {}
+        try:
+            with transaction.atomic():
+                NotificationLog.objects.bulk_create(fresh, batch_size=500)
+            mine = fresh
+        except IntegrityError:
+            # Paralel calisma ayni anahtari yazdi: tek tek dene; sadece bu calismanin
+            # yazdigi kayitlar gonderilir, digerleri ledger'a mevcut kayitla baglanir
+            mine = []
+            for log in fresh:
+                row, created = insert_log(log)
+                if created:
+                    mine.append(row)
+                elif row:
+                    by_key[log.dedupe_key] = row.pk
+        by_key.update({log.dedupe_key: log.pk for log in mine})
+        for reminder in ledger:
+            reminder.notification_id = by_key.get(getattr(reminder, "dedupe_key", None))
+        TireReminder.objects.bulk_create(ledger, batch_size=500, ignore_conflicts=True)
+    return send_batch(mine)
 
 
 def on_workorder_created(order: WorkOrder) -> None:
@@ -75,42 +155,70 @@ def on_workorder_created(order: WorkOrder) -> None:
         f"İşlem: {order.get_kind_display()}\n"
         f"Tarih: {timezone.localtime(order.created_at).strftime('%d.%m.%Y %H:%M')}"
     )
-    send_whatsapp(branch_id=order.branch_id, to=to, message=msg)
+    enqueue_whatsapp(branch_id=order.branch_id, to=to, message=msg, idempotency_key=f"workorder:{order.pk}:created")
 
 
-def on_tirehotel_created(entry: TireHotelEntry) -> None:
-    """Lastik otele alınınca WhatsApp bildirimi."""
+def _tirehotel_message(entry: TireHotelEntry, head: str, when, location: bool = False):
+    """(to, mesaj) veya telefon yoksa None."""
     customer = getattr(entry, "customer", None)
     if not customer or not getattr(customer, "phone", None):
-        return
+        return None
     to = to_e164_tr(customer.phone)
     if not to:
-        return
+        return None
     plate = getattr(entry, "plate_text", None) or getattr(entry, "plate", None) or "-"
-    loc = f"{getattr(entry,'rack_code','')}/{getattr(entry,'slot_code','')}".strip("/")
-    msg = (
-        f"Merhaba {customer.full_name}.\n"
-        f"Lastikleriniz depoya alındı ✅\n"
-        f"Plaka: {plate}\n"
-        f"Konum: {loc or '-'}\n"
-        f"Tarih: {timezone.localtime(entry.created_at).strftime('%d.%m.%Y %H:%M')}"
-    )
-    send_whatsapp(branch_id=entry.branch_id, to=to, message=msg)
+    lines = [f"Merhaba {customer.full_name}.", head, f"Plaka: {plate}"]
+    if location:
+        loc = f"{getattr(entry,'rack_code','')}/{getattr(entry,'slot_code','')}".strip("/")
+        lines.append(f"Konum: {loc or '-'}")
+    lines.append(f"Tarih: {timezone.localtime(when).strftime('%d.%m.%Y %H:%M')}")
+    return to, "\n".join(lines)
+
+
+def on_tirehotel_created(entry: TireHotelEntry) -> None:
+    """Lastik otele alınınca WhatsApp bildirimi."""
+    built = _tirehotel_message(entry, "Lastikleriniz depoya alındı ✅", entry.created_at, location=True)
+    if not built:
+        return
+    to, msg = built
+    enqueue_whatsapp(branch_id=entry.branch_id, to=to, message=msg, idempotency_key=f"tire:{entry.pk}:created")
 
 
 def on_tirehotel_delivered(entry: TireHotelEntry) -> None:
     """Lastik teslim edilince WhatsApp bildirimi."""
-    customer = getattr(entry, "customer", None)
-    if not customer or not getattr(customer, "phone", None):
-        return
-    to = to_e164_tr(customer.phone)
-    if not to:
+    built = _tirehotel_message(entry, "Lastikleriniz teslim edildi ✅", timezone.now())
+    if not built:
         return
-    plate = getattr(entry, "plate_text", None) or getattr(entry, "plate", None) or "-"
-    msg = (
-        f"Merhaba {customer.full_name}.\n"
-        f"Lastikleriniz teslim edildi ✅\n"
-        f"Plaka: {plate}\n"
-        f"Tarih: {timezone.localtime(timezone.now()).strftime('%d.%m.%Y %H:%M')}"
+    to, msg = built
+    enqueue_whatsapp(
+        branch_id=entry.branch_id, to=to, message=msg,
+        idempotency_key=f"tire:{entry.pk}:delivered:{entry.released_at or timezone.localdate()}",
+    )
+
+
+def enqueue_tirehotel_batch(entries, event: str) -> int:
+    """Toplu giris ("received") / cikis ("delivered") bildirimleri: outbox'a tek bulk_create.
+
+    Cagiranin transaction'i ile commit edilir; gonderimi drain_notifications yapar.
+    Ayni gun ayni kayit icin tekrar yazilmaz (dedupe_key). Yazilan kayit sayisini dondurur.
+    """
+    now = timezone.now()
+    logs = []
+    for entry in entries:
+        if event == "delivered":
+            built = _tirehotel_message(entry, "Lastikleriniz teslim edildi ✅", now)
+            key = f"tire:{entry.pk}:delivered:{entry.released_at or timezone.localdate()}"
+        else:
+            built = _tirehotel_message(entry, "Lastikleriniz depoya alındı ✅", now, location=True)
+            key = f"tire:{entry.pk}:received:{entry.received_at or timezone.localdate()}"
+        if built:
+            to, msg = built
+            logs.append(new_log(entry.branch_id, NotificationLog.CHANNEL_WHATSAPP, to, msg, idempotency_key=key))
+    if not logs:
+        return 0
+    seen = set(
+        NotificationLog.objects.filter(dedupe_key__in=[log.dedupe_key for log in logs]).values_list("dedupe_key", flat=True)
     )
-    send_whatsapp(branch_id=entry.branch_id, to=to, message=msg)
+    fresh = [log for log in logs if log.dedupe_key not in seen]
+    NotificationLog.objects.bulk_create(fresh, batch_size=500, ignore_conflicts=True)
+    return len(fresh)
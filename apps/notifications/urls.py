@@ -3,4 +3,6 @@ from . import views
 
 urlpatterns = [
     path("test/", views.notify_test, name="notify_test"),
+    path("status/", views.notify_status, name="notify_status"),
+    path("status/reset/", views.notify_breaker_reset, name="notify_breaker_reset"),
 ]
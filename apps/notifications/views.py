@@ -1,8 +1,16 @@
+from datetime import timedelta
+
 from django.contrib.auth.decorators import login_required
+from django.db.models import Count, Min, Q
 from django.shortcuts import render, redirect
 from django.contrib import messages
+from django.utils import timezone
+from django.views.decorators.http import require_POST
 
+from apps.core.permissions import admin_required
 from .forms import NotifyTestForm
+from .models import NotificationLog
+from .providers import CircuitBreaker, provider_keys
 from .service import send_sms, send_whatsapp
 
 
@@ -31,3 +39,29 @@ def notify_test(request):
         form = NotifyTestForm()
 
     return render(request, "notifications/notify_test.html", {"form": form})
+
+
+@login_required
+@admin_required
+def notify_status(request):
+    """Provider devre kesici durumu + outbox ozeti."""
+    since = timezone.now() - timedelta(hours=24)
+    outbox = NotificationLog.objects.aggregate(
+        pending=Count("id", filter=Q(status=NotificationLog.STATUS_PENDING, next_attempt_at__isnull=False)),
+        oldest_pending=Min("created_at", filter=Q(status=NotificationLog.STATUS_PENDING, next_attempt_at__isnull=False)),
+        sent_24h=Count("id", filter=Q(status=NotificationLog.STATUS_SENT, sent_at__gte=since)),
+        failed_24h=Count("id", filter=Q(status=NotificationLog.STATUS_FAILED, created_at__gte=since)),
+    )
+    breakers = [CircuitBreaker(key).status() for key in provider_keys()]
+    return render(request, "notifications/status.html", {"breakers": breakers, "outbox": outbox})
+
+
+@login_required
+@admin_required
+@require_POST
+def notify_breaker_reset(request):
+    key = request.POST.get("key") or ""
+    if key in provider_keys():
+        CircuitBreaker(key).reset()
+        messages.success(request, f"Devre kapatildi: {key}")
+    return redirect("notify_status")
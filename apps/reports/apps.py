@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class ReportsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "apps.reports"
+    verbose_name = "Raporlar"
+
+    def ready(self):
+        from . import signals  # noqa: F401
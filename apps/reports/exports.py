@@ -0,0 +1,260 @@
+"""Rapor / gecmis disa aktarimi (CSV, XLSX) -- akis halinde.
+
+Satirlar `.iterator(chunk_size=...)` ile okunup parca parca yazilir; tarih
+araligi ne kadar genis olursa olsun bellek kullanimi sabit kalir.
+XLSX icin ek bagimlilik yok: tek sayfali, inline-string hucreli minimal bir
+calisma kitabi zipfile ile akis olarak uretilir.
+"""
+
+import csv
+import datetime
+import re
+import zipfile
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from apps.inventory.models import WorkOrderPart
+from apps.workorders.models import WorkOrder
+from .services import day_bounds, daily_rows
+
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+ROWS_PER_CHUNK = 200
+
+
+def _chunk_size() -> int:
+    return int(getattr(settings, "EXPORT_CHUNK_SIZE", 2000))
+
+
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _safe_text(text: str) -> str:
+    """Serbest metin Excel'de formul olarak calismasin (CSV/formula injection): basina ' eklenir."""
+    if text.startswith(FORMULA_PREFIXES):
+        return "'" + text
+    return text
+
+
+def _cell_text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return _safe_text(value)
+    if isinstance(value, datetime.datetime):
+        return timezone.localtime(value).strftime("%d.%m.%Y %H:%M")
+    if isinstance(value, datetime.date):
+        return value.strftime("%d.%m.%Y")
+    if isinstance(value, bool):
+        return "Evet" if value else "Hayır"
+    return str(value)
+
+
+# -------------------------
+# CSV
+# -------------------------
+class _Echo:
+    """csv.writer icin: yazilani geri dondurur (tampon yok)."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(header, rows):
+    writer = csv.writer(_Echo())
+    yield "\ufeff" + writer.writerow(header)  # BOM: Excel UTF-8'i tanisin
+    buf = []
+    for row in rows:
+        buf.append(writer.writerow([_cell_text(v) for v in row]))
+        if len(buf) >= ROWS_PER_CHUNK:
+            yield "".join(buf)
+            buf = []
+    if buf:
+        yield "".join(buf)
+
+
+# -------------------------
+# XLSX
+# -------------------------
+_NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+_XML_HEAD = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+_ILLEGAL_XML = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_CONTENT_TYPES = (
+    _XML_HEAD
+    + '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    "</Types>"
+)
+_ROOT_RELS = (
+    _XML_HEAD
+    + f'<Relationships xmlns="{_NS_PKG_REL}">'
+    f'<Relationship Id="rId1" Type="{_NS_REL}/officeDocument" Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+_WORKBOOK_RELS = (
+    _XML_HEAD
+    + f'<Relationships xmlns="{_NS_PKG_REL}">'
+    f'<Relationship Id="rId1" Type="{_NS_REL}/worksheet" Target="worksheets/sheet1.xml"/>'
+    "</Relationships>"
+)
+
+
+class _Sink:
+    """zipfile'in yazdigi baytlari toplar; generator her adimda bosaltir (seek yok)."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _xlsx_cell(value) -> str:
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return f"<c><v>{value}</v></c>"
+    text = _ILLEGAL_XML.sub("", _cell_text(value))
+    if not text:
+        return "<c/>"
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+
+
+def _xlsx_row(values) -> str:
+    return "<row>" + "".join(_xlsx_cell(v) for v in values) + "</row>"
+
+
+def stream_xlsx(header, rows, sheet_name="Rapor"):
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _ROOT_RELS)
+        zf.writestr(
+            "xl/workbook.xml",
+            _XML_HEAD
+            + f'<workbook xmlns="{_NS_MAIN}" xmlns:r="{_NS_REL}"><sheets>'
+            f'<sheet name="{escape(sheet_name[:31])}" sheetId="1" r:id="rId1"/>'
+            "</sheets></workbook>",
+        )
+        zf.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        yield sink.drain()
+
+        with zf.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write((_XML_HEAD + f'<worksheet xmlns="{_NS_MAIN}"><sheetData>').encode())
+            sheet.write(_xlsx_row(header).encode())
+            for i, row in enumerate(rows, 1):
+                sheet.write(_xlsx_row(row).encode())
+                if i % ROWS_PER_CHUNK == 0:
+                    yield sink.drain()
+            sheet.write(b"</sheetData></worksheet>")
+    yield sink.drain()
+
+
+def export_response(fmt: str, filename: str, header, rows) -> StreamingHttpResponse:
+    if fmt == "xlsx":
+        content = stream_xlsx(header, rows)
+    else:
+        fmt = "csv"
+        content = stream_csv(header, rows)
+    response = StreamingHttpResponse(content, content_type=FORMATS[fmt])
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{fmt}"'
+    return response
+
+
+# -------------------------
+# Veri setleri: (baslik, satir iteratoru)
+# -------------------------
+def revenue_rows(branch_id, start_day, end_day, kind=""):
+    header = ["Tarih", "İş Sayısı", "Grand Toplam", "İşçilik Toplam", "Parça Toplam"]
+    rows = (
+        (r["day"], r["count"], r["sum_grand"], r["sum_labor"], r["sum_parts"])
+        for r in daily_rows(branch_id, start_day, end_day, kind=kind)
+    )
+    return header, rows
+
+
+def profit_rows(branch_id, start_day, end_day, kind=""):
+    header = ["Tarih", "Ciro", "Parça Maliyeti", "Kâr"]
+    rows = (
+        (r["day"], r["sum_grand"], r["parts_cost"], r["sum_grand"] - r["parts_cost"])
+        for r in daily_rows(branch_id, start_day, end_day, kind=kind)
+    )
+    return header, rows
+
+
+def workorder_rows(branch_id, start_day, end_day, kind=""):
+    """Is emri gecmisi (acilis tarihine gore)."""
+    start, _ = day_bounds(start_day)
+    _, end = day_bounds(end_day)
+    qs = WorkOrder.objects.filter(branch_id=branch_id, created_at__gte=start, created_at__lt=end)
+    if kind:
+        qs = qs.filter(kind=kind)
+    kinds = dict(WorkOrder.KIND_CHOICES)
+    statuses = dict(WorkOrder.STATUS_CHOICES)
+
+    header = [
+        "No", "Açılış", "Teslim", "Tür", "Durum", "Plaka", "Müşteri",
+        "İşçilik", "Parça", "Toplam", "Parça Maliyeti", "Ödeme", "Ödendi",
+    ]
+    values = qs.order_by("created_at", "id").values_list(
+        "id", "created_at", "finished_at", "kind", "status", "plate_text", "vehicle__plate",
+        "customer__full_name", "labor_total", "parts_total", "grand_total", "parts_cost",
+        "payment_method", "is_paid",
+    )
+    rows = (
+        (r[0], r[1], r[2], kinds.get(r[3], r[3]), statuses.get(r[4], r[4]), r[5] or r[6] or "", *r[7:])
+        for r in values.iterator(chunk_size=_chunk_size())
+    )
+    return header, rows
+
+
+def workorder_part_rows(branch_id, start_day, end_day, kind=""):
+    """Is emri parca satirlari (is emrinin acilis tarihine gore)."""
+    start, _ = day_bounds(start_day)
+    _, end = day_bounds(end_day)
+    qs = WorkOrderPart.objects.filter(
+        order__branch_id=branch_id, order__created_at__gte=start, order__created_at__lt=end
+    )
+    if kind:
+        qs = qs.filter(order__kind=kind)
+
+    header = [
+        "İş Emri", "Açılış", "Plaka", "Stok Kodu", "Parça", "Miktar",
+        "Birim Fiyat", "Satır Toplamı", "Birim Maliyet", "Eklenme",
+    ]
+    values = qs.order_by("order__created_at", "order_id", "id").values_list(
+        "order_id", "order__created_at", "order__plate_text", "order__vehicle__plate", "part__sku", "part__name",
+        "qty", "unit_price", "line_total", "unit_cost", "created_at",
+    )
+    rows = ((*r[:2], r[2] or r[3] or "", *r[4:]) for r in values.iterator(chunk_size=_chunk_size()))
+    return header, rows
+
+
+DATASETS = {
+    "revenue": ("gelir", revenue_rows),
+    "profit": ("karlilik", profit_rows),
+    "workorders": ("is-emirleri", workorder_rows),
+    "workorder-parts": ("is-emri-parcalari", workorder_part_rows),
+}
@@ -0,0 +1,43 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+
+from apps.core.models import Branch
+from apps.reports.services import local_day, rebuild_range
+from apps.workorders.models import WorkOrder
+
+
+class Command(BaseCommand):
+    help = "BranchDailyStats gunluk ozet tablosunu DONE is emirlerinden (yeniden) doldurur"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--branch", type=int, default=None, help="Sadece bu sube")
+        parser.add_argument("--start", type=str, default=None, help="YYYY-MM-DD (default: ilk kayit)")
+        parser.add_argument("--end", type=str, default=None, help="YYYY-MM-DD (default: son kayit)")
+        parser.add_argument("--chunk-days", type=int, default=31, help="Tek seferde islenecek gun sayisi")
+
+    def handle(self, *args, **options):
+        branches = Branch.objects.all()
+        if options.get("branch"):
+            branches = branches.filter(id=options["branch"])
+        chunk = datetime.timedelta(days=max(1, options.get("chunk_days") or 31))
+
+        total = 0
+        for branch in branches:
+            span = WorkOrder.objects.filter(
+                branch=branch, status=WorkOrder.STATUS_DONE, finished_at__isnull=False
+            ).aggregate(first=Min("finished_at"), last=Max("finished_at"))
+            if not span["first"]:
+                continue
+            start = datetime.date.fromisoformat(options["start"]) if options.get("start") else local_day(span["first"])
+            end = datetime.date.fromisoformat(options["end"]) if options.get("end") else local_day(span["last"])
+
+            day = start
+            while day <= end:
+                last = min(day + chunk - datetime.timedelta(days=1), end)
+                total += rebuild_range(branch.id, day, last)
+                day = last + datetime.timedelta(days=1)
+            self.stdout.write(f"{branch}: {start} - {end}")
+
+        self.stdout.write(self.style.SUCCESS(f"OK: {total} gunluk ozet satiri yazildi"))
@@ -0,0 +1,104 @@
+import datetime
+import random
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core.models import Branch
+from apps.inventory.models import Part, WorkOrderPart
+from apps.reports.services import daily_rows, local_day, rebuild_range
+from apps.workorders.models import WorkOrder
+from apps.workorders.services import recalc_totals
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Karlilik raporu benchmark'i: gecici subede N DONE is emri uretir, gunluk ozeti "
+        "yeniden kurar ve raporu okur; sure / is emri orani sabit kalmali (lineer). "
+        "Tum veri sonunda geri alinir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=str, default="10000,50000,100000", help="Artan is emri sayilari")
+        parser.add_argument("--lines", type=int, default=2, help="Is emri basina parca satiri")
+        parser.add_argument("--days", type=int, default=365, help="Is emirlerinin yayilacagi gun sayisi")
+        parser.add_argument("--batch", type=int, default=2000)
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(x) for x in options["sizes"].split(",") if x.strip())
+        try:
+            with transaction.atomic():
+                self._run(sizes, options)
+                raise _Rollback
+        except _Rollback:
+            pass
+        self.stdout.write(self.style.SUCCESS("OK: benchmark verisi geri alindi"))
+
+    def _run(self, sizes, options):
+        rnd = random.Random(options["seed"])
+        lines = max(0, options["lines"])
+        days = max(1, options["days"])
+        batch = options["batch"]
+
+        branch = Branch.objects.create(name="BENCH")
+        parts = Part.objects.bulk_create(
+            [
+                Part(branch=branch, sku=f"BENCH-{i}", name=f"Bench parca {i}",
+                     sale_price=Decimal(100 + i), cost_price=Decimal(60 + i))
+                for i in range(20)
+            ]
+        )
+        now = timezone.now()
+        first_day = local_day(now - datetime.timedelta(days=days))
+        last_day = local_day(now)
+
+        created = 0
+        self.stdout.write("orders   rollup_ms  read_ms  us/order")
+        for size in sizes:
+            while created < size:
+                n = min(batch, size - created)
+                orders = WorkOrder.objects.bulk_create(
+                    [
+                        WorkOrder(
+                            branch=branch,
+                            kind=WorkOrder.KIND_VEHICLE_REPAIR,
+                            status=WorkOrder.STATUS_DONE,
+                            plate_text=f"34 BN {created + i}",
+                            labor_total=Decimal(rnd.randint(100, 900)),
+                            finished_at=now - datetime.timedelta(minutes=rnd.randint(0, days * 24 * 60 - 1)),
+                        )
+                        for i in range(n)
+                    ]
+                )
+                wops = []
+                for o in orders:
+                    for _ in range(lines):
+                        p = rnd.choice(parts)
+                        qty = Decimal(rnd.randint(1, 4))
+                        wops.append(WorkOrderPart(
+                            order=o, part=p, qty=qty, unit_price=p.sale_price,
+                            line_total=qty * p.sale_price, unit_cost=p.cost_price,
+                        ))
+                WorkOrderPart.objects.bulk_create(wops, batch_size=batch)
+                recalc_totals([o.pk for o in orders])
+                created += n
+
+            t0 = time.perf_counter()
+            rebuild_range(branch.id, first_day, last_day)
+            t1 = time.perf_counter()
+            # Boyutlar ayni transaction'da (commit yok -> cache versiyonu artmaz): cache'siz oku
+            rows = daily_rows(branch.id, first_day, last_day, cached=False)
+            t2 = time.perf_counter()
+
+            assert sum(r["count"] for r in rows) == size
+            self.stdout.write(
+                f"{size:>6}   {(t1 - t0) * 1000:>9.1f}  {(t2 - t1) * 1000:>7.1f}  {(t1 - t0) * 1e6 / size:>8.2f}"
+            )
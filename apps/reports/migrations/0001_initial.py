@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BranchDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('kind', models.CharField(choices=[('CAR_WASH', 'Oto Yıkama'), ('TIRE_REPAIR', 'Lastik Tamir'), ('VEHICLE_REPAIR', 'Araç Tamir')], max_length=20)),
+                ('order_count', models.PositiveIntegerField(default=0)),
+                ('labor_total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('parts_total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('grand_total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('parts_cost', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('branch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.branch')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('branch', 'day', 'kind'), name='reports_daily_branch_day_kind_uniq')],
+            },
+        ),
+    ]
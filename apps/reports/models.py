@@ -0,0 +1,31 @@
+from django.db import models
+from apps.core.models import Branch
+from apps.workorders.models import WorkOrder
+
+
+class BranchDailyStats(models.Model):
+    """Gunluk sube ozeti (DONE is emirleri, finished_at gunune gore, ture gore ayri).
+
+    Is emri DONE olunca / DONE sonrasi duzenlenince ilgili gun yeniden hesaplanir
+    (bkz. services.rebuild_day). Raporlar bu tablodan okur.
+    """
+
+    branch = models.ForeignKey(Branch, on_delete=models.CASCADE)
+    day = models.DateField()
+    kind = models.CharField(max_length=20, choices=WorkOrder.KIND_CHOICES)
+
+    order_count = models.PositiveIntegerField(default=0)
+    labor_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    parts_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    grand_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    parts_cost = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["branch", "day", "kind"], name="reports_daily_branch_day_kind_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.branch_id} {self.day} {self.kind}: {self.grand_total}"
@@ -0,0 +1,110 @@
+"""Gecmis gunlerin rapor ozetleri icin (sube, gun) cache'i.
+
+Bugunden onceki gunlerin toplamlari ancak o gune ait bir is emri degisince
+degisir; bu yuzden gun ozeti suresiz (REPORT_CACHE_TIMEOUT) cache'lenir.
+Bugun her istekte BranchDailyStats'tan okunur. Anahtar (sube, gun) "versiyonu"nu
+icerir (tirehotel.occupancy gibi): gecmis bir gun yeniden hesaplaninca
+(services.rebuild_range) sadece o gunun versiyonu commit sonrasi artirilir;
+commit oncesi veriyle doldurulmus anahtarlar eski versiyonda kalir ve bir daha
+okunmaz. Bugunun yeniden hesaplanmasi cache'e dokunmaz.
+"""
+
+import datetime
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import BranchDailyStats
+
+FIELDS = ("order_count", "labor_total", "parts_total", "grand_total", "parts_cost")
+
+
+def _version_key(branch_id, day: datetime.date) -> str:
+    return f"reports:day:ver:{branch_id}:{day.isoformat()}"
+
+
+def _key(branch_id, day: datetime.date, version) -> str:
+    return f"reports:day:{branch_id}:{day.isoformat()}:{version}"
+
+
+def _timeout():
+    return getattr(settings, "REPORT_CACHE_TIMEOUT", None)
+
+
+def _versions(branch_id, days) -> dict:
+    """{gun: versiyon} -- tek get_many; anahtari olmayan gunler zamandan baslar."""
+    vkeys = {_version_key(branch_id, d): d for d in days}
+    found = cache.get_many(list(vkeys))
+    missing = [k for k in vkeys if k not in found]
+    if missing:
+        # Versiyon anahtari dustuyse eski ozetlere denk gelmemek icin zamandan baslar
+        start = time.time_ns()
+        for k in missing:
+            cache.add(k, start, None)
+        found.update(cache.get_many(missing))
+    return {vkeys[k]: v for k, v in found.items()}
+
+
+def _days(start_day: datetime.date, end_day: datetime.date):
+    day = start_day
+    while day <= end_day:
+        yield day
+        day += datetime.timedelta(days=1)
+
+
+def _load(branch_id, days) -> dict:
+    """{gun: {kind: {alan: deger}}} -- verilen gunler icin tek sorgu (bos gunler {})."""
+    days = sorted(days)
+    data = {d: {} for d in days}
+    if not days:
+        return data
+    rows = BranchDailyStats.objects.filter(branch_id=branch_id, day__gte=days[0], day__lte=days[-1]).values(
+        "day", "kind", *FIELDS
+    )
+    for r in rows:
+        if r["day"] in data:
+            data[r["day"]][r["kind"]] = {f: r[f] for f in FIELDS}
+    return data
+
+
+def load_days(branch_id, start_day: datetime.date, end_day: datetime.date) -> dict:
+    """get_days'in cache'siz hali (benchmark / dogrulama)."""
+    return _load(branch_id, _days(start_day, end_day))
+
+
+def get_days(branch_id, start_day: datetime.date, end_day: datetime.date) -> dict:
+    """[start_day, end_day] icin {gun: {kind: toplamlar}}; gecmis gunler cache'ten."""
+    today = timezone.localdate()
+    days = list(_days(start_day, end_day))
+    versions = _versions(branch_id, [d for d in days if d < today])
+    past = {_key(branch_id, d, v): d for d, v in versions.items()}
+
+    cached = cache.get_many(list(past)) if past else {}
+    result = {past[k]: v for k, v in cached.items()}
+
+    missing = [d for k, d in past.items() if k not in cached]
+    live = missing + [d for d in days if d >= today or d not in versions]
+    if live:
+        loaded = _load(branch_id, live)
+        result.update(loaded)
+        if missing:
+            cache.set_many({_key(branch_id, d, versions[d]): loaded[d] for d in missing}, _timeout())
+    return result
+
+
+def invalidate_range(branch_id, start_day: datetime.date, end_day: datetime.date) -> None:
+    """Gunler yeniden yazildi: gecmis gunlerin versiyonlari commit sonrasi artirilir."""
+
+    def _bump():
+        today = timezone.localdate()
+        for day in _days(start_day, min(end_day, today - datetime.timedelta(days=1))):
+            try:
+                cache.incr(_version_key(branch_id, day))
+            except ValueError:
+                cache.set(_version_key(branch_id, day), time.time_ns(), None)
+
+    if start_day <= end_day:
+        transaction.on_commit(_bump)
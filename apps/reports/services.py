@@ -0,0 +1,120 @@
+import datetime
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from apps.workorders.models import WorkOrder
+from .models import BranchDailyStats
+from .report_cache import get_days, invalidate_range, load_days
+
+DEC0 = Decimal("0.00")
+DECIMAL = DecimalField(max_digits=12, decimal_places=2)
+
+
+def day_bounds(day: datetime.date):
+    """Yerel gun -> [baslangic, ertesi gun) aware datetime araligi (index dostu)."""
+    tz = timezone.get_current_timezone()
+    start = datetime.datetime.combine(day, datetime.time.min, tzinfo=tz)
+    return start, start + datetime.timedelta(days=1)
+
+
+def local_day(value: datetime.datetime) -> datetime.date:
+    return timezone.localtime(value).date()
+
+
+def _done_orders(branch_id, start, end):
+    return WorkOrder.objects.filter(
+        branch_id=branch_id,
+        status=WorkOrder.STATUS_DONE,
+        finished_at__gte=start,
+        finished_at__lt=end,
+    )
+
+
+def _rollup_rows(qs):
+    """(day, kind) bazinda gruplu ozet satirlari.
+
+    Maliyet is emrindeki parts_cost snapshot'indan gelir (satir/parca join'i yok).
+    """
+    return (
+        qs.annotate(day=TruncDate("finished_at"))
+        .values("day", "kind")
+        .annotate(
+            order_count=Count("id"),
+            labor=Coalesce(Sum("labor_total"), DEC0, output_field=DECIMAL),
+            parts=Coalesce(Sum("parts_total"), DEC0, output_field=DECIMAL),
+            grand=Coalesce(Sum("grand_total"), DEC0, output_field=DECIMAL),
+            cost=Coalesce(Sum("parts_cost"), DEC0, output_field=DECIMAL),
+        )
+        .order_by()
+    )
+
+
+def _to_stats(branch_id, rows):
+    return [
+        BranchDailyStats(
+            branch_id=branch_id,
+            day=r["day"],
+            kind=r["kind"],
+            order_count=r["order_count"],
+            labor_total=r["labor"],
+            parts_total=r["parts"],
+            grand_total=r["grand"],
+            parts_cost=r["cost"],
+        )
+        for r in rows
+    ]
+
+
+def rebuild_range(branch_id: int, start_day: datetime.date, end_day: datetime.date) -> int:
+    """[start_day, end_day] gunlerini DONE is emirlerinden yeniden yazar."""
+    start, _ = day_bounds(start_day)
+    _, end = day_bounds(end_day)
+    with transaction.atomic():
+        BranchDailyStats.objects.filter(branch_id=branch_id, day__gte=start_day, day__lte=end_day).delete()
+        objs = _to_stats(branch_id, _rollup_rows(_done_orders(branch_id, start, end)))
+        BranchDailyStats.objects.bulk_create(objs, batch_size=1000)
+        invalidate_range(branch_id, start_day, end_day)
+    return len(objs)
+
+
+def rebuild_day(branch_id: int, day: datetime.date) -> int:
+    return rebuild_range(branch_id, day, day)
+
+
+def refresh_order_days(*pairs) -> None:
+    """(branch_id, finished_at) ciftlerinin gunlerini yeniden hesaplar (tekrarsiz)."""
+    seen = set()
+    for branch_id, finished_at in pairs:
+        if not branch_id or not finished_at:
+            continue
+        key = (branch_id, local_day(finished_at))
+        if key not in seen:
+            seen.add(key)
+            rebuild_day(*key)
+
+
+def daily_rows(branch_id: int, start_day: datetime.date, end_day: datetime.date, kind: str = "", cached: bool = True):
+    """Rapor satirlari: gun basina toplam (turler birlestirilmis).
+
+    Gecmis gunler report_cache'ten gelir; sadece bugun / cache'te olmayan gunler sorgulanir.
+    cached=False: tum gunler BranchDailyStats'tan (cache okunmaz / yazilmaz).
+    """
+    rows = []
+    days = get_days(branch_id, start_day, end_day) if cached else load_days(branch_id, start_day, end_day)
+    for day, kinds in sorted(days.items()):
+        stats = [v for k, v in kinds.items() if not kind or k == kind]
+        if not stats:
+            continue
+        rows.append({
+            "day": day,
+            "count": sum(s["order_count"] for s in stats),
+            "sum_labor": sum((s["labor_total"] for s in stats), DEC0),
+            "sum_parts": sum((s["parts_total"] for s in stats), DEC0),
+            "sum_grand": sum((s["grand_total"] for s in stats), DEC0),
+            "parts_cost": sum((s["parts_cost"] for s in stats), DEC0),
+        })
+    return rows
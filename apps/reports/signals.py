@@ -0,0 +1,65 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.inventory.models import WorkOrderPart
+from apps.workorders.models import WorkOrder, WorkOrderItem
+from .services import refresh_order_days
+
+
+@receiver(pre_save, sender=WorkOrder)
+def _remember_done_state(sender, instance, **kwargs):
+    # DONE'dan cikan / gunu degisen emirlerde eski gun de yeniden hesaplanmali
+    instance._rollup_old = None
+    if instance.pk:
+        instance._rollup_old = (
+            WorkOrder.objects.filter(pk=instance.pk, status=WorkOrder.STATUS_DONE)
+            .values_list("branch_id", "finished_at")
+            .first()
+        )
+
+
+@receiver(post_save, sender=WorkOrder)
+def _workorder_saved(sender, instance, **kwargs):
+    pairs = []
+    old = getattr(instance, "_rollup_old", None)
+    if old:
+        pairs.append(old)
+    if instance.status == WorkOrder.STATUS_DONE:
+        pairs.append((instance.branch_id, instance.finished_at))
+    refresh_order_days(*pairs)
+
+
+@receiver(post_delete, sender=WorkOrder)
+def _workorder_deleted(sender, instance, **kwargs):
+    if instance.status == WorkOrder.STATUS_DONE:
+        refresh_order_days((instance.branch_id, instance.finished_at))
+
+
+def _refresh_done_order(order_id) -> None:
+    # Toplamlar recalc_totals ile queryset update'iyle yazilir (sinyal yok);
+    # commit sonrasi guncel toplamlarla teslim gunu yeniden hesaplanir.
+    def _refresh():
+        done = (
+            WorkOrder.objects.filter(pk=order_id, status=WorkOrder.STATUS_DONE)
+            .values_list("branch_id", "finished_at")
+            .first()
+        )
+        if done:
+            refresh_order_days(done)
+
+    transaction.on_commit(_refresh)
+
+
+@receiver(post_save, sender=WorkOrderPart)
+@receiver(post_delete, sender=WorkOrderPart)
+def _workorder_part_changed(sender, instance, **kwargs):
+    # Teslim sonrasi parca eklenip cikarilirsa (toplam + maliyet degisir)
+    _refresh_done_order(instance.order_id)
+
+
+@receiver(post_save, sender=WorkOrderItem)
+@receiver(post_delete, sender=WorkOrderItem)
+def _workorder_item_changed(sender, instance, **kwargs):
+    # Teslim sonrasi iscilik / satir duzeltmesi (toplam degisir)
+    _refresh_done_order(instance.order_id)
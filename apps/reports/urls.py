@@ -4,4 +4,5 @@ from . import views
 urlpatterns = [
     path("revenue/", views.revenue_report, name="revenue_report"),
     path("profit/", views.profit_report, name="profit_report"),
+    path("export/<str:dataset>/", views.report_export, name="report_export"),
 ]
@@ -1,28 +1,22 @@
 from datetime import datetime, timedelta
-from decimal import Decimal
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Sum, Count, DecimalField, F, ExpressionWrapper, Q
-from django.db.models.functions import Coalesce, TruncDate
+from django.http import Http404
 from django.shortcuts import redirect, render
 
-from apps.core.models import BranchMembership
-from apps.workorders.models import WorkOrder
+from apps.core.permissions import can_manage_branch
+from .exports import DATASETS, export_response
+from .services import DEC0, daily_rows
 
 
 def _can_manage(request, branch_id: int) -> bool:
-    role = (
-        BranchMembership.objects
-        .filter(user=request.user, branch_id=branch_id, is_active=True)
-        .values_list("role", flat=True)
-        .first()
-    )
-    return role in (BranchMembership.ROLE_ADMIN, BranchMembership.ROLE_MANAGER)
+    return can_manage_branch(request, branch_id)
 
 
 def _get_date_range(request):
-    """GET paramlarından tarih aralığını alır (default son 30 gün)."""
+    """GET paramlarından tarih aralığını alır (default son 30 gün, en fazla REPORT_MAX_DAYS gün)."""
     try:
         start_str = request.GET.get("start")
         end_str = request.GET.get("end")
@@ -31,6 +25,10 @@ def _get_date_range(request):
     except Exception:
         start_date = (datetime.now() - timedelta(days=30)).date()
         end_date = datetime.now().date()
+    # Aralik gun basina cache anahtari / satir uretir: en fazla REPORT_MAX_DAYS gun
+    max_days = int(getattr(settings, "REPORT_MAX_DAYS", 732))
+    if (end_date - start_date).days >= max_days:
+        start_date = end_date - timedelta(days=max_days - 1)
     return start_date, end_date
 
 
@@ -50,36 +48,17 @@ def revenue_report(request):
         return redirect("/")
 
     start_date, end_date = _get_date_range(request)
+    kind = (request.GET.get("kind") or "").strip()
 
-    DEC0 = Decimal("0.00")
-    DECIMAL = DecimalField(max_digits=12, decimal_places=2)
-
-    qs = (
-        WorkOrder.objects
-        .filter(branch_id=branch_id, status=WorkOrder.STATUS_DONE)
-        .filter(finished_at__isnull=False)  # ✅ bitiş tarihi yoksa rapora girme
-        .filter(finished_at__date__gte=start_date, finished_at__date__lte=end_date)
-    )
-
-    daily_qs = (
-        qs.annotate(day=TruncDate("finished_at"))  # ✅ created_at değil!
-        .values("day")
-        .annotate(
-            count=Count("id"),
-            sum_grand=Coalesce(Sum("grand_total"), DEC0, output_field=DECIMAL),
-            sum_labor=Coalesce(Sum("labor_total"), DEC0, output_field=DECIMAL),
-            sum_parts=Coalesce(Sum("parts_total"), DEC0, output_field=DECIMAL),
-        )
-        .order_by("day")
-    )
-
-    rows = list(daily_qs)
+    # ✅ Günlük özet tablosundan (BranchDailyStats): 1 yıllık rapor = ~365 satır
+    rows = daily_rows(int(branch_id), start_date, end_date, kind=kind)
 
-    totals = qs.aggregate(
-        labor_total=Coalesce(Sum("labor_total"), DEC0, output_field=DECIMAL),
-        parts_total=Coalesce(Sum("parts_total"), DEC0, output_field=DECIMAL),
-        grand_total=Coalesce(Sum("grand_total"), DEC0, output_field=DECIMAL),
-    )
+    totals = {
+        "count": sum((r["count"] for r in rows), 0),
+        "sum_grand": sum((r["sum_grand"] for r in rows), DEC0),
+        "sum_labor": sum((r["sum_labor"] for r in rows), DEC0),
+        "sum_parts": sum((r["sum_parts"] for r in rows), DEC0),
+    }
 
     chart_labels = [r["day"].strftime("%d.%m") for r in rows]
     chart_grand = [float(r["sum_grand"] or 0) for r in rows]
@@ -118,36 +97,13 @@ def profit_report(request):
         return redirect("/")
 
     start_date, end_date = _get_date_range(request)
+    kind = (request.GET.get("kind") or "").strip()
 
-    DEC0 = Decimal("0.00")
-    DECIMAL = DecimalField(max_digits=12, decimal_places=2)
-
-    # WorkOrder.parts -> WorkOrderPart.qty and WorkOrderPart.part.cost_price
-    part_cost_expr = ExpressionWrapper(
-        F("parts__qty") * F("parts__part__cost_price"),
-        output_field=DECIMAL,
-    )
-
-    qs = (
-        WorkOrder.objects
-        .filter(branch_id=branch_id, status=WorkOrder.STATUS_DONE)
-        .filter(finished_at__isnull=False)
-        .filter(finished_at__date__gte=start_date, finished_at__date__lte=end_date)
-    )
-
-    daily = (
-        qs.annotate(day=TruncDate("finished_at"))  # ✅ created_at değil!
-        .values("day")
-        .annotate(
-            count=Count("id"),
-            revenue=Coalesce(Sum("grand_total"), DEC0, output_field=DECIMAL),
-            parts_cost=Coalesce(Sum(part_cost_expr), DEC0, output_field=DECIMAL),
-        )
-        .order_by("day")
-    )
-
-    rows = list(daily)
+    # ✅ Günlük özet tablosundan; parça maliyeti iş emrindeki parts_cost
+    # snapshot'ından (kullanım anındaki maliyet, join yok -> ciro çoğalmaz)
+    rows = daily_rows(int(branch_id), start_date, end_date, kind=kind)
     for r in rows:
+        r["revenue"] = r["sum_grand"]
         r["profit"] = (r["revenue"] or DEC0) - (r["parts_cost"] or DEC0)
 
     totals = {
@@ -175,3 +131,33 @@ def profit_report(request):
             "chart_profit": chart_profit,
         },
     )
+
+
+@login_required
+def report_export(request, dataset):
+    """
+    ✅ Dışa aktarım (CSV / XLSX): gelir, karlılık, iş emri ve parça geçmişi
+    ✅ Filtreler raporlarla aynı: start / end (_get_date_range), kind, branch (default aktif şube)
+    ✅ Akış halinde (StreamingHttpResponse) -> yıllık export'ta bellek sabit
+    """
+    if dataset not in DATASETS:
+        raise Http404
+
+    branch_id = request.GET.get("branch") or request.session.get("active_branch_id")
+    try:
+        branch_id = int(branch_id)
+    except (TypeError, ValueError):
+        messages.error(request, "Aktif şube seçili değil.")
+        return redirect("/")
+
+    if not _can_manage(request, branch_id):
+        messages.error(request, "Bu sayfa için yetkin yok.")
+        return redirect("/")
+
+    start_date, end_date = _get_date_range(request)
+    kind = (request.GET.get("kind") or "").strip()
+    fmt = (request.GET.get("format") or "csv").strip().lower()
+
+    prefix, build = DATASETS[dataset]
+    header, rows = build(branch_id, start_date, end_date, kind=kind)
+    return export_response(fmt, f"{prefix}_{start_date.isoformat()}_{end_date.isoformat()}", header, rows)
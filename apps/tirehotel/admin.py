@@ -1,5 +1,6 @@
-from django.contrib import admin
-from .models import TireHotelEntry
+from django.contrib import admin, messages
+from .models import TireHotelEntry, TireRack, TireReminder, TireSlot
+from .services import SlotUnavailable, sync_rack_slots
 
 
 @admin.register(TireHotelEntry)
@@ -7,3 +8,33 @@ class TireHotelEntryAdmin(admin.ModelAdmin):
     list_display = ("id", "branch", "plate_text", "customer", "season", "qty", "rack_code", "slot_code", "is_active", "created_at")
     list_filter = ("branch", "season", "is_active")
     search_fields = ("plate_text", "customer__full_name", "rack_code", "slot_code")
+    readonly_fields = ("photo_thumb", "photo_preview", "photo_pending")
+
+
+@admin.register(TireReminder)
+class TireReminderAdmin(admin.ModelAdmin):
+    list_display = ("id", "entry", "stage", "due_at", "notification", "created_at")
+    list_filter = ("stage",)
+    raw_id_fields = ("entry", "notification")
+
+
+@admin.register(TireRack)
+class TireRackAdmin(admin.ModelAdmin):
+    list_display = ("id", "branch", "code", "slot_count", "position")
+    list_filter = ("branch",)
+    search_fields = ("code",)
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        try:
+            sync_rack_slots(obj)
+        except SlotUnavailable as e:
+            self.message_user(request, str(e), level=messages.ERROR)
+
+
+@admin.register(TireSlot)
+class TireSlotAdmin(admin.ModelAdmin):
+    list_display = ("id", "branch", "rack", "code", "entry")
+    list_filter = ("branch", "rack")
+    raw_id_fields = ("entry",)
+    readonly_fields = ("branch", "rack", "rack_position", "number", "code")
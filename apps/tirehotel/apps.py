@@ -5,3 +5,7 @@ class TirehotelConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.tirehotel"
     verbose_name = "Lastik Otel"
+
+    def ready(self):
+        # Doluluk haritasi cache'ini kayit degisince gecersiz kil
+        from apps.tirehotel import signals  # noqa: F401
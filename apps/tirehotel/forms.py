@@ -24,3 +24,10 @@ class TireHotelCreateForm(forms.ModelForm):
             "received_at": forms.DateInput(attrs={"type": "date"}),
             "due_at": forms.DateInput(attrs={"type": "date"}),
         }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Bos birakilirsa siradaki bos goz atanir (services.place_entry)
+        for name in ("rack_code", "slot_code"):
+            self.fields[name].required = False
+            self.fields[name].widget.attrs.setdefault("placeholder", "Otomatik")
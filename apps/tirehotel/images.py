@@ -0,0 +1,119 @@
+"""Lastik otel fotograflari: liste icin kucuk resim + etiket icin orta boy onizleme.
+
+Telefon fotograflari (4-8 MB) istekte islenmez: kayit photo_pending=True ile
+yazilir (TireHotelEntry.save), process_tire_photos worker'i Pillow ile EXIF
+yonunu uygular, EXIF'i atar ve WebP (Pillow desteklemiyorsa JPEG) uretir.
+Orijinal dosyaya dokunulmaz.
+"""
+
+import logging
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+
+from .models import TireHotelEntry
+
+logger = logging.getLogger(__name__)
+
+# alan -> (ayar, varsayilan uzun kenar px)
+VARIANTS = {
+    "photo_thumb": ("TIREHOTEL_THUMB_PX", 240),
+    "photo_preview": ("TIREHOTEL_PREVIEW_PX", 1024),
+}
+EXTENSIONS = {"WEBP": ".webp", "JPEG": ".jpg"}
+
+
+def image_format() -> str:
+    fmt = str(getattr(settings, "TIREHOTEL_IMAGE_FORMAT", "WEBP")).upper()
+    if fmt == "WEBP" and not features.check("webp"):
+        return "JPEG"
+    return fmt if fmt in EXTENSIONS else "JPEG"
+
+
+def _quality() -> int:
+    return int(getattr(settings, "TIREHOTEL_IMAGE_QUALITY", 80))
+
+
+def _encode(img: Image.Image, max_px: int, fmt: str) -> bytes:
+    img = img.copy()
+    img.thumbnail((max_px, max_px), Image.LANCZOS)
+    if fmt == "JPEG" and img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    buf = BytesIO()
+    # exif verilmedigi icin yazilmaz (konum vb. metadata atilir)
+    if fmt == "WEBP":
+        img.save(buf, "WEBP", quality=_quality(), method=4)
+    else:
+        img.save(buf, "JPEG", quality=_quality(), optimize=True, progressive=True)
+    return buf.getvalue()
+
+
+def render_variants(fileobj, fmt: str) -> dict:
+    """{alan: bayt}: fotografi bir kez acip tum boyutlari uretir."""
+    sizes = {name: int(getattr(settings, key, default)) for name, (key, default) in VARIANTS.items()}
+    with Image.open(fileobj) as img:
+        # JPEG'i tam cozmeden kucult (4-8 MB fotografta asil kazanc burada)
+        largest = max(sizes.values())
+        img.draft("RGB", (largest, largest))
+        img = ImageOps.exif_transpose(img)
+        if img.mode in ("P", "LA", "I;16", "I", "F", "CMYK"):
+            img = img.convert("RGBA" if "A" in img.mode or img.mode == "P" else "RGB")
+        return {name: _encode(img, px, fmt) for name, px in sizes.items()}
+
+
+def process_photo(entry: TireHotelEntry) -> bool:
+    """Kaydin kucuk boyutlarini uretip kaydeder. Okunamayan foto False (tekrar denenmez)."""
+    old = [f.name for f in (entry.photo_thumb, entry.photo_preview) if f]
+    fields = ["photo_pending", *VARIANTS]
+    entry.photo_pending = False
+    if not entry.photo:
+        entry.photo_thumb = entry.photo_preview = None
+        entry.save(update_fields=fields)
+        return True
+
+    fmt = image_format()
+    try:
+        with entry.photo.open("rb") as f:
+            data = render_variants(f, fmt)
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError, ValueError) as e:
+        logger.warning("tirehotel foto islenemedi #%s (%s): %s", entry.pk, entry.photo.name, e)
+        entry.save(update_fields=["photo_pending"])
+        return False
+
+    base = os.path.splitext(os.path.basename(entry.photo.name))[0]
+    for name, content in data.items():
+        getattr(entry, name).save(f"{base}{EXTENSIONS[fmt]}", ContentFile(content), save=False)
+    entry.save(update_fields=fields)
+
+    storage = entry.photo.storage
+    for name in old:
+        if name not in (entry.photo_thumb.name, entry.photo_preview.name):
+            storage.delete(name)
+    return True
+
+
+def pending_entries():
+    return TireHotelEntry.objects.filter(photo_pending=True).order_by("id")
+
+
+def process_pending(limit: int = 20) -> tuple:
+    """Kuyruktan en fazla `limit` kayit isler: (islenen, hatali).
+
+    Her kayit kendi kisa transaction'inda satir kilidiyle (Postgres'te SKIP LOCKED)
+    alinir; birden fazla worker ayni fotoyu islemez.
+    """
+    done = failed = 0
+    for _ in range(limit):
+        with transaction.atomic():
+            entry = pending_entries().select_for_update(skip_locked=True).first()
+            if entry is None:
+                break
+            if process_photo(entry):
+                done += 1
+            else:
+                failed += 1
+    return done, failed
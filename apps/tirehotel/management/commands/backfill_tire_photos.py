@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from apps.tirehotel.images import process_pending
+from apps.tirehotel.models import TireHotelEntry
+
+
+class Command(BaseCommand):
+    help = "Fotografi olup kucuk resmi olmayan lastik otel kayitlarini foto kuyruguna alir"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Kucuk resmi olanlari da yeniden uret")
+        parser.add_argument("--process", action="store_true", help="Kuyrugu worker beklemeden simdi isle")
+        parser.add_argument("--dry-run", action="store_true", help="Sadece say, yazma")
+
+    def handle(self, *args, **options):
+        qs = TireHotelEntry.objects.exclude(Q(photo="") | Q(photo__isnull=True)).filter(photo_pending=False)
+        if not options["all"]:
+            qs = qs.filter(Q(photo_thumb="") | Q(photo_thumb__isnull=True))
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(f"OK: {qs.count()} kayit kuyruga alinacak"))
+            return
+
+        queued = qs.update(photo_pending=True)
+        self.stdout.write(f"{queued} kayit kuyruga alindi")
+        if not options["process"]:
+            self.stdout.write(self.style.SUCCESS("OK: process_tire_photos worker'i isleyecek"))
+            return
+
+        total_done = total_failed = 0
+        while True:
+            done, failed = process_pending(50)
+            total_done += done
+            total_failed += failed
+            if not (done or failed):
+                break
+            self.stdout.write(f"islendi={total_done} hatali={total_failed}")
+        self.stdout.write(self.style.SUCCESS(f"OK: islendi={total_done} hatali={total_failed}"))
@@ -0,0 +1,41 @@
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.tirehotel.images import process_pending
+
+
+class Command(BaseCommand):
+    help = "Lastik otel fotograflarinin kucuk resim / onizlemelerini uretir; surekli calisan worker"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch", type=int, default=20, help="Tek turda islenecek kayit")
+        parser.add_argument("--sleep", type=float, default=5.0, help="Kuyruk bosken bekleme (sn)")
+        parser.add_argument("--once", action="store_true", help="Kuyrugu bir kez bosaltip cik (cron)")
+
+    def handle(self, *args, **options):
+        batch = max(1, options["batch"])
+        self._stop = False
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+
+        total_done = total_failed = 0
+        while not self._stop:
+            close_old_connections()
+            done, failed = process_pending(batch)
+            total_done += done
+            total_failed += failed
+            if done or failed:
+                self.stdout.write(f"islendi={done} hatali={failed}")
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(f"OK: islendi={total_done} hatali={total_failed}"))
+
+    def _request_stop(self, signum, frame):
+        # Elindeki fotoyu bitirip cik
+        self._stop = True
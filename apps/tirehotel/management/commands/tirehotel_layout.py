@@ -0,0 +1,52 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Q
+
+from apps.tirehotel.models import TireRack
+from apps.tirehotel.services import RACK_PREFIX, SlotUnavailable, define_racks
+
+
+def parse_racks(value: str) -> list:
+    """'R1-R20' / '1-20' / 'R1,R2,R7' -> ['R1', 'R2', ...]"""
+    codes = []
+    for part in (value or "").split(","):
+        part = part.strip().upper()
+        m = re.fullmatch(rf"{RACK_PREFIX}?(\d+)-{RACK_PREFIX}?(\d+)", part)
+        if m:
+            start, end = int(m.group(1)), int(m.group(2))
+            codes += [f"{RACK_PREFIX}{n}" for n in range(start, end + 1)]
+        elif part:
+            codes.append(part)
+    return codes
+
+
+class Command(BaseCommand):
+    help = "Lastik otel depo yerlesimini (raf x goz) tanimlar / gosterir"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--branch", type=int, required=True, help="Sube id")
+        parser.add_argument("--racks", default="", help="Orn: R1-R20 veya R1,R2,R7 (verilen sira = doldurma sirasi)")
+        parser.add_argument("--slots", type=int, default=20, help="Raf basina goz sayisi")
+
+    def handle(self, *args, **options):
+        branch_id = options["branch"]
+        codes = parse_racks(options["racks"])
+        if codes:
+            if options["slots"] < 1:
+                raise CommandError("--slots en az 1 olmali")
+            try:
+                define_racks(branch_id, codes, options["slots"])
+            except SlotUnavailable as e:
+                raise CommandError(str(e))
+
+        racks = (
+            TireRack.objects.filter(branch_id=branch_id)
+            .annotate(total=Count("slots"), used=Count("slots", filter=Q(slots__entry__isnull=False)))
+        )
+        total = used = 0
+        for rack in racks:
+            total += rack.total
+            used += rack.used
+            self.stdout.write(f"{rack.code}: {rack.used}/{rack.total} dolu")
+        self.stdout.write(self.style.SUCCESS(f"OK: {len(racks)} raf, {used}/{total} goz dolu"))
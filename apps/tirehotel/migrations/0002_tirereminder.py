@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('customers', '0002_alter_customer_email_alter_customer_notes_and_more'),
+        ('notifications', '0003_notificationlog_dedupe_key'),
+        ('tirehotel', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TireReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(choices=[('T7', '7 gun kala'), ('T1', '1 gun kala'), ('OVERDUE', 'Gecikmis')], max_length=10)),
+                ('due_at', models.DateField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='tirehotelentry',
+            index=models.Index(fields=['is_active', 'due_at'], name='tirehotel_t_is_acti_f7c5b6_idx'),
+        ),
+        migrations.AddField(
+            model_name='tirereminder',
+            name='entry',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='tirehotel.tirehotelentry'),
+        ),
+        migrations.AddField(
+            model_name='tirereminder',
+            name='notification',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='notifications.notificationlog'),
+        ),
+        migrations.AddConstraint(
+            model_name='tirereminder',
+            constraint=models.UniqueConstraint(fields=('entry', 'stage', 'due_at'), name='tirehotel_reminder_once'),
+        ),
+    ]
@@ -0,0 +1,96 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def split_shared_slots(apps, schema_editor):
+    """Ayni gozu paylasan aktif kayitlar (eski R1/G1 varsayilani): en eskisi kalir,
+    digerleri '?<id>' gozune alinir ve notuna eski konum yazilir (elle yerlestirilmeli)."""
+    Entry = apps.get_model("tirehotel", "TireHotelEntry")
+    shared = (
+        Entry.objects.filter(is_active=True)
+        .values("branch_id", "rack_code", "slot_code")
+        .annotate(n=Count("id"), keep=Min("id"))
+        .filter(n__gt=1)
+    )
+    for row in shared:
+        moved = Entry.objects.filter(
+            is_active=True, branch_id=row["branch_id"], rack_code=row["rack_code"], slot_code=row["slot_code"]
+        ).exclude(pk=row["keep"])
+        for e in moved:
+            old = f"{e.rack_code}/{e.slot_code}"
+            e.slot_code = f"?{e.pk}"[:10]
+            e.notes = (e.notes + "\n" if e.notes else "") + f"Yer cakismasi: eski konum {old}"
+            e.save(update_fields=["slot_code", "notes"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('customers', '0002_alter_customer_email_alter_customer_notes_and_more'),
+        ('tirehotel', '0002_tirereminder'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TireRack',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('code', models.CharField(help_text='Raf kodu: orn R3', max_length=10)),
+                ('slot_count', models.PositiveIntegerField(default=20, help_text='Raftaki goz sayisi (kapasite)')),
+                ('position', models.PositiveIntegerField(default=0, help_text='Otomatik yerlestirmede doldurma sirasi')),
+            ],
+            options={
+                'ordering': ['position', 'id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='TireSlot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rack_position', models.PositiveIntegerField(default=0)),
+                ('number', models.PositiveIntegerField()),
+                ('code', models.CharField(max_length=10)),
+            ],
+        ),
+        migrations.RunPython(split_shared_slots, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='tirehotelentry',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('branch', 'rack_code', 'slot_code'), name='tirehotel_active_slot_once'),
+        ),
+        migrations.AddField(
+            model_name='tirerack',
+            name='branch',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='core.branch'),
+        ),
+        migrations.AddField(
+            model_name='tireslot',
+            name='branch',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='core.branch'),
+        ),
+        migrations.AddField(
+            model_name='tireslot',
+            name='entry',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='slot', to='tirehotel.tirehotelentry'),
+        ),
+        migrations.AddField(
+            model_name='tireslot',
+            name='rack',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slots', to='tirehotel.tirerack'),
+        ),
+        migrations.AddConstraint(
+            model_name='tirerack',
+            constraint=models.UniqueConstraint(fields=('branch', 'code'), name='tirehotel_rack_code_once'),
+        ),
+        migrations.AddIndex(
+            model_name='tireslot',
+            index=models.Index(condition=models.Q(('entry__isnull', True)), fields=['branch', 'rack_position', 'number'], name='tirehotel_slot_free_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='tireslot',
+            constraint=models.UniqueConstraint(fields=('rack', 'number'), name='tirehotel_slot_number_once'),
+        ),
+    ]
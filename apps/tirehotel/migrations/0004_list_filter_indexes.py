@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('customers', '0002_alter_customer_email_alter_customer_notes_and_more'),
+        ('tirehotel', '0003_warehouse_layout'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tirehotelentry',
+            index=models.Index(fields=['branch', 'is_active', 'due_at'], name='tirehotel_t_branch__53d327_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tirehotelentry',
+            index=models.Index(fields=['branch', 'plate_text'], name='tirehotel_t_branch__636c5f_idx'),
+        ),
+    ]
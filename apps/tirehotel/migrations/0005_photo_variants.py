@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('customers', '0002_alter_customer_email_alter_customer_notes_and_more'),
+        ('tirehotel', '0004_list_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tirehotelentry',
+            name='photo_pending',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tirehotelentry',
+            name='photo_preview',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='tirehotel/preview'),
+        ),
+        migrations.AddField(
+            model_name='tirehotelentry',
+            name='photo_thumb',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='tirehotel/thumb'),
+        ),
+        migrations.AddIndex(
+            model_name='tirehotelentry',
+            index=models.Index(condition=models.Q(('photo_pending', True)), fields=['id'], name='tirehotel_photo_pending_idx'),
+        ),
+    ]
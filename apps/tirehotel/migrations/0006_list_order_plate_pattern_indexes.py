@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('customers', '0002_alter_customer_email_alter_customer_notes_and_more'),
+        ('tirehotel', '0005_photo_variants'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='tirehotelentry',
+            name='tirehotel_t_branch__636c5f_idx',
+        ),
+        migrations.AddIndex(
+            model_name='tirehotelentry',
+            index=models.Index(fields=['branch', 'plate_text'], name='tirehotel_branch_plate_idx', opclasses=['int8_ops', 'varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='tirehotelentry',
+            index=models.Index(fields=['branch', 'is_active', 'created_at', 'id'], name='tirehotel_list_order_idx'),
+        ),
+    ]
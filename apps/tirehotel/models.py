@@ -1,8 +1,17 @@
 from django.db import models
+from django.db.models import Q
 from apps.core.models import Branch
 from apps.customers.models import Customer, Vehicle
 
 
+LABEL_PREFIX = "TH"
+
+
+def label_code(pk: int) -> str:
+    """Etikette basilan / okutulan kod: TH000123."""
+    return f"{LABEL_PREFIX}{pk:06d}"
+
+
 class TireHotelEntry(models.Model):
     SEASON_SUMMER = "SUMMER"
     SEASON_WINTER = "WINTER"
@@ -28,12 +37,161 @@ class TireHotelEntry(models.Model):
     released_at = models.DateField(null=True, blank=True)
 
     photo = models.ImageField(upload_to="tirehotel", blank=True, null=True)
+    # Liste / etiket icin kucuk boyutlar (images.py worker'i uretir; orijinal istekte islenmez)
+    photo_thumb = models.ImageField(upload_to="tirehotel/thumb", blank=True, null=True, editable=False)
+    photo_preview = models.ImageField(upload_to="tirehotel/preview", blank=True, null=True, editable=False)
+    photo_pending = models.BooleanField(default=False, editable=False)
 
     is_active = models.BooleanField(default=True)
     notes = models.TextField(blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # gunluk hatirlatma taramasi (aktif + son tarih araligi)
+            models.Index(fields=["is_active", "due_at"]),
+            # liste filtreleri: durum + son tarih araligi / plaka on-eki
+            models.Index(fields=["branch", "is_active", "due_at"]),
+            # Postgres: LIKE 'X%' on-ek aramasi icin pattern_ops (C disi locale'de de index kullanilir)
+            models.Index(
+                fields=["branch", "plate_text"],
+                opclasses=["int8_ops", "varchar_pattern_ops"],
+                name="tirehotel_branch_plate_idx",
+            ),
+            # liste sirasi: keyset (-created_at, -id)
+            models.Index(fields=["branch", "is_active", "created_at", "id"], name="tirehotel_list_order_idx"),
+            # foto worker kuyrugu
+            models.Index(fields=["id"], condition=Q(photo_pending=True), name="tirehotel_photo_pending_idx"),
+        ]
+        constraints = [
+            # Ayni gozde ayni anda tek aktif set (cikis yapilanlar serbest)
+            models.UniqueConstraint(
+                fields=["branch", "rack_code", "slot_code"],
+                condition=Q(is_active=True),
+                name="tirehotel_active_slot_once",
+            ),
+        ]
+
     def __str__(self):
         plate = self.plate_text or (self.vehicle.plate if self.vehicle else "-")
         return f"{plate} - {self.season} ({self.rack_code}/{self.slot_code})"
+
+    @property
+    def label_code(self) -> str:
+        return label_code(self.pk) if self.pk else ""
+
+    def sync_photo_state(self) -> list:
+        """Yeni foto yuklendiyse kucuk boyutlari sifirlayip kuyruga alir; degisen alanlari dondurur.
+
+        save() cagirir; bulk_create oncesi elle cagrilmali.
+        """
+        if self.photo and not self.photo._committed:
+            self.photo_thumb = self.photo_preview = None
+            self.photo_pending = True
+        elif not self.photo and (self.photo_thumb or self.photo_pending):
+            self.photo_thumb = self.photo_preview = None
+            self.photo_pending = False
+        else:
+            return []
+        return ["photo_thumb", "photo_preview", "photo_pending"]
+
+    def save(self, *args, **kwargs):
+        changed = self.sync_photo_state()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and changed and "photo" in update_fields:
+            kwargs["update_fields"] = {*update_fields, *changed}
+        super().save(*args, **kwargs)
+
+
+class TireReminder(models.Model):
+    """Kayit basina gonderilmis hatirlatma asamalari (T-7, T-1, gecikmis).
+
+    Gunluk is sadece yeni bir esigi gecen (bu tabloda satiri olmayan) kayitlari secer.
+    due_at degisirse (sure uzatma) asamalar yeni tarih icin tekrar islenir.
+    """
+
+    STAGE_T7 = "T7"
+    STAGE_T1 = "T1"
+    STAGE_OVERDUE = "OVERDUE"
+    STAGE_CHOICES = [(STAGE_T7, "7 gun kala"), (STAGE_T1, "1 gun kala"), (STAGE_OVERDUE, "Gecikmis")]
+
+    entry = models.ForeignKey(TireHotelEntry, on_delete=models.CASCADE, related_name="reminders")
+    stage = models.CharField(max_length=10, choices=STAGE_CHOICES)
+    due_at = models.DateField()
+    # Telefonu olmayan kayitlarda bos: asama yine islenmis sayilir
+    notification = models.ForeignKey(
+        "notifications.NotificationLog", on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["entry", "stage", "due_at"], name="tirehotel_reminder_once"),
+        ]
+
+    def __str__(self):
+        return f"#{self.entry_id} {self.stage} ({self.due_at})"
+
+
+RACK_PREFIX = "R"
+SLOT_PREFIX = "G"
+
+
+def slot_code(number: int) -> str:
+    return f"{SLOT_PREFIX}{number}"
+
+
+class TireRack(models.Model):
+    """Depo yerlesimi: sube basina raflar, her rafta `slot_count` goz (G1..Gn)."""
+
+    branch = models.ForeignKey(Branch, on_delete=models.PROTECT)
+    code = models.CharField(max_length=10, help_text="Raf kodu: orn R3")
+    slot_count = models.PositiveIntegerField(default=20, help_text="Raftaki goz sayisi (kapasite)")
+    position = models.PositiveIntegerField(default=0, help_text="Otomatik yerlestirmede doldurma sirasi")
+
+    class Meta:
+        ordering = ["position", "id"]
+        constraints = [
+            models.UniqueConstraint(fields=["branch", "code"], name="tirehotel_rack_code_once"),
+        ]
+
+    def __str__(self):
+        return f"{self.code} ({self.slot_count} goz)"
+
+
+class TireSlot(models.Model):
+    """Raf gozu + doluluk indeksi: entry bos ise goz bostur.
+
+    Bos gozler (branch, rack_position, number) uzerinde kismi index'te tutulur;
+    siradaki bos goz tek index aramasi ile bulunur (services.allocate_slots).
+    """
+
+    branch = models.ForeignKey(Branch, on_delete=models.PROTECT)
+    rack = models.ForeignKey(TireRack, on_delete=models.CASCADE, related_name="slots")
+    rack_position = models.PositiveIntegerField(default=0)  # rack.position kopyasi (index icin)
+    number = models.PositiveIntegerField()
+    code = models.CharField(max_length=10)
+    entry = models.OneToOneField(
+        TireHotelEntry, on_delete=models.SET_NULL, null=True, blank=True, related_name="slot"
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["rack", "number"], name="tirehotel_slot_number_once"),
+        ]
+        indexes = [
+            models.Index(
+                fields=["branch", "rack_position", "number"],
+                condition=Q(entry__isnull=True),
+                name="tirehotel_slot_free_idx",
+            ),
+        ]
+
+    @property
+    def is_free(self) -> bool:
+        return self.entry_id is None
+
+    def __str__(self):
+        return f"{self.rack.code}/{self.code}"
@@ -0,0 +1,138 @@
+"""Depo1 doluluk haritasi (raf x goz) -- sube basina cache'li.
+
+Harita aktif kayitlar uzerinde tek gruplu sorgu + raf tanimlarindan kurulur.
+Cache anahtari sube "versiyonu" ve bugunu icerir: giris / duzenleme / cikista
+versiyon commit sonrasi artirilir (eski harita okunmaz, suresi dolunca duser);
+gun degisince "yaklasan / gecmis" durumlari yeniden hesaplanir.
+"""
+
+import datetime
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Max, Min
+from django.utils import timezone
+
+from .models import TireHotelEntry, TireRack, slot_code
+
+FREE = "free"
+OCCUPIED = "occupied"
+DUE_SOON = "due_soon"
+OVERDUE = "overdue"
+STATES = (FREE, OCCUPIED, DUE_SOON, OVERDUE)
+
+
+def _version_key(branch_id) -> str:
+    return f"tirehotel:map:ver:{branch_id}"
+
+
+def _key(branch_id, version, today: datetime.date) -> str:
+    return f"tirehotel:map:{branch_id}:{version}:{today.isoformat()}"
+
+
+def _timeout() -> int:
+    return int(getattr(settings, "TIREHOTEL_MAP_CACHE_TIMEOUT", 3600))
+
+
+def _due_soon_days() -> int:
+    return int(getattr(settings, "TIREHOTEL_DUE_SOON_DAYS", 7))
+
+
+def _version(branch_id):
+    # Versiyon anahtari dustuyse eski haritalara denk gelmemek icin zamandan baslar
+    cache.add(_version_key(branch_id), time.time_ns(), None)
+    return cache.get(_version_key(branch_id))
+
+
+def bump_version(*branch_ids) -> None:
+    """Sube haritalarini gecersiz kilar (commit sonrasi)."""
+
+    def _bump():
+        for branch_id in set(branch_ids):
+            try:
+                cache.incr(_version_key(branch_id))
+            except ValueError:
+                cache.set(_version_key(branch_id), time.time_ns(), None)
+
+    if branch_ids:
+        transaction.on_commit(_bump)
+
+
+def _number(code: str) -> int:
+    m = re.search(r"\d+", code or "")
+    return int(m.group()) if m else 0
+
+
+def _state(due, today, soon) -> str:
+    if due is None:
+        return OCCUPIED
+    if due < today:
+        return OVERDUE
+    if due <= soon:
+        return DUE_SOON
+    return OCCUPIED
+
+
+def build_map(branch_id, today: datetime.date) -> dict:
+    """{"racks": [{"code", "slots": [{"code", "state", "entry_id", "plate", "due_at", "count"}]}],
+        "extra": [yerlesim disi dolu gozler], "counts": {durum: adet}}"""
+    soon = today + datetime.timedelta(days=_due_soon_days())
+    rows = (
+        TireHotelEntry.objects.filter(branch_id=branch_id, is_active=True)
+        .values("rack_code", "slot_code")
+        .annotate(count=Count("id"), entry_id=Max("id"), plate=Max("plate_text"), due_at=Min("due_at"))
+        .order_by()
+    )
+    occupied = {
+        (r["rack_code"], r["slot_code"]): {
+            "code": r["slot_code"],
+            "state": _state(r["due_at"], today, soon),
+            "entry_id": r["entry_id"],
+            "plate": r["plate"],
+            "due_at": r["due_at"],
+            "count": r["count"],
+        }
+        for r in rows
+    }
+
+    layout = list(TireRack.objects.filter(branch_id=branch_id).values_list("code", "slot_count"))
+    if not layout:
+        # Yerlesim tanimsiz: dolu gozlerden turet
+        widths = {}
+        for rack_code, code in occupied:
+            widths[rack_code] = max(widths.get(rack_code, 0), _number(code))
+        layout = sorted(widths.items(), key=lambda x: (_number(x[0]), x[0]))
+
+    racks = []
+    for rack_code, slot_count in layout:
+        slots = []
+        for n in range(1, slot_count + 1):
+            code = slot_code(n)
+            cell = occupied.pop((rack_code, code), None)
+            slots.append(cell or {"code": code, "state": FREE})
+        racks.append({"code": rack_code, "slots": slots})
+
+    extra = [
+        dict(cell, code=f"{rack_code}/{code}")
+        for (rack_code, code), cell in sorted(occupied.items())
+    ]
+    counts = dict.fromkeys(STATES, 0)
+    for rack in racks:
+        for cell in rack["slots"]:
+            counts[cell["state"]] += 1
+    for cell in extra:
+        counts[cell["state"]] += 1
+    return {"racks": racks, "extra": extra, "counts": counts}
+
+
+def get_map(branch_id) -> dict:
+    today = timezone.localdate()
+    key = _key(branch_id, _version(branch_id), today)
+    data = cache.get(key)
+    if data is None:
+        data = build_map(branch_id, today)
+        cache.set(key, data, _timeout())
+    return data
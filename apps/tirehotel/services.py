@@ -0,0 +1,338 @@
+"""Lastik otel depo yerlesimi: raf/goz tanimi, bos goz atama ve bosaltma.
+
+Doluluk TireSlot.entry uzerinden tutulur; bos gozler kismi index'te oldugu icin
+siradaki bos goz depo buyuklugunden bagimsiz tek index aramasiyla bulunur.
+Es zamanli girislerde:
+- Postgres'te bos gozler SKIP LOCKED ile kilitlenir (iki giris ayni gozu secmez),
+- goz, "hala bos ise" kosullu UPDATE ile doldurulur,
+- TireHotelEntry'deki kismi unique constraint (aktif branch/raf/goz) son guvencedir.
+Cakisma olursa yerlestirme savepoint icinde birkac kez tekrar denenir.
+"""
+
+import re
+import time
+from dataclasses import dataclass, field
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.utils import timezone
+
+from apps.notifications.triggers import enqueue_tirehotel_batch
+from .models import LABEL_PREFIX, RACK_PREFIX, SLOT_PREFIX, TireHotelEntry, TireRack, TireSlot, label_code, slot_code
+from .occupancy import bump_version
+
+PLACE_RETRIES = 3
+
+
+class SlotUnavailable(Exception):
+    pass
+
+
+class _SlotConflict(Exception):
+    """Yaris: secilen goz bu arada baska bir kayda verildi (tekrar denenir)."""
+
+
+def normalize_code(value, prefix: str) -> str:
+    """'14' -> 'R14', ' g3 ' -> 'G3'. Bos deger bos doner."""
+    value = re.sub(r"\s+", "", str(value or "")).upper()
+    if value and value.isdigit():
+        value = f"{prefix}{value}"
+    return value
+
+
+# -------------------------
+# Yerlesim
+# -------------------------
+def sync_rack_slots(rack: TireRack) -> int:
+    """Raf gozlerini slot_count'a esitler ve bu gozdeki aktif kayitlari baglar.
+
+    Dolu gozler silinmez (SlotUnavailable). Baglanan kayit sayisini dondurur.
+    """
+    with transaction.atomic():
+        TireSlot.objects.bulk_create(
+            [
+                TireSlot(branch_id=rack.branch_id, rack=rack, rack_position=rack.position, number=n, code=slot_code(n))
+                for n in range(1, rack.slot_count + 1)
+            ],
+            batch_size=500,
+            ignore_conflicts=True,
+        )
+        surplus = TireSlot.objects.filter(rack=rack, number__gt=rack.slot_count)
+        if surplus.filter(entry__isnull=False).exists():
+            raise SlotUnavailable(f"{rack.code}: dolu gozler var, goz sayisi azaltilamaz.")
+        surplus.delete()
+        TireSlot.objects.filter(rack=rack).exclude(rack_position=rack.position).update(rack_position=rack.position)
+
+        free = {s.code: s for s in TireSlot.objects.filter(rack=rack, entry__isnull=True)}
+        entries = TireHotelEntry.objects.filter(
+            branch_id=rack.branch_id, is_active=True, rack_code=rack.code, slot_code__in=list(free), slot__isnull=True
+        ).values_list("id", "slot_code")
+        linked = []
+        for entry_id, code in entries:
+            slot = free[code]
+            slot.entry_id = entry_id
+            linked.append(slot)
+        TireSlot.objects.bulk_update(linked, ["entry"], batch_size=500)
+        bump_version(rack.branch_id)
+    return len(linked)
+
+
+def define_racks(branch_id: int, codes, slot_count: int) -> list:
+    """Raflari olusturur / goz sayisini gunceller (sira: verilen sira). Raf listesi doner."""
+    racks = []
+    with transaction.atomic():
+        for position, code in enumerate(codes, 1):
+            rack, _ = TireRack.objects.update_or_create(
+                branch_id=branch_id,
+                code=normalize_code(code, RACK_PREFIX),
+                defaults={"slot_count": slot_count, "position": position},
+            )
+            sync_rack_slots(rack)
+            racks.append(rack)
+    return racks
+
+
+# -------------------------
+# Atama
+# -------------------------
+def free_slots(branch_id: int):
+    """Bos gozler doldurma sirasiyla (kismi index: tirehotel_slot_free_idx)."""
+    return TireSlot.objects.filter(branch_id=branch_id, entry__isnull=True).order_by("rack_position", "number")
+
+
+def allocate_slots(branch_id: int, count: int = 1, exclude=()) -> list:
+    """Siradaki `count` bos gozu kilitleyip dondurur; transaction icinde cagrilmali."""
+    qs = free_slots(branch_id).select_related("rack").select_for_update(skip_locked=True, of=("self",))
+    if exclude:
+        qs = qs.exclude(pk__in=list(exclude))
+    slots = list(qs[:count])
+    if len(slots) < count:
+        raise SlotUnavailable(
+            f"Depoda yeterli bos goz yok (istenen {count}, bos {len(slots)}). Raf/goz girin veya raf ekleyin."
+        )
+    return slots
+
+
+def _target_slots(branch_id: int, entries) -> dict:
+    """Raf/gozu elle girilmis kayitlar icin yerlesimdeki gozler: {(raf, goz): TireSlot}."""
+    wanted = {(e.rack_code, e.slot_code) for e in entries}
+    if not wanted:
+        return {}
+    cond = Q()
+    for rack_code, code in wanted:
+        cond |= Q(rack__code=rack_code, code=code)
+    qs = TireSlot.objects.filter(branch_id=branch_id).filter(cond).select_related("rack")
+    return {(s.rack.code, s.code): s for s in qs.select_for_update(of=("self",))}
+
+
+def _occupy(pairs) -> None:
+    """Gozleri tek kosullu UPDATE ile doldurur: goz bos (veya zaten bu kayitta) olmali."""
+    for i in range(0, len(pairs), 500):
+        chunk = pairs[i : i + 500]
+        updated = (
+            TireSlot.objects.filter(pk__in=[s.pk for _, s in chunk])
+            .filter(Q(entry__isnull=True) | Q(entry_id__in=[e.pk for e, _ in chunk]))
+            .update(entry_id=Case(*[When(pk=s.pk, then=Value(e.pk)) for e, s in chunk], output_field=IntegerField()))
+        )
+        if updated != len(chunk):
+            raise _SlotConflict()
+
+
+def _place(branch_id: int, entries, tried: set, fields=None) -> None:
+    auto = [e for e in entries if not (e.rack_code and e.slot_code)]
+    manual = [e for e in entries if e.rack_code and e.slot_code]
+
+    pairs = []
+    for e, slot in zip(auto, allocate_slots(branch_id, len(auto), exclude=tried) if auto else []):
+        e.rack_code, e.slot_code = slot.rack.code, slot.code
+        tried.add(slot.pk)
+        pairs.append((e, slot))
+
+    targets = _target_slots(branch_id, manual)
+    for e in manual:
+        slot = targets.get((e.rack_code, e.slot_code))
+        if slot is None:
+            continue  # yerlesim disi goz: sadece unique constraint korur
+        if slot.entry_id and slot.entry_id != e.pk:
+            raise SlotUnavailable(f"{e.rack_code}/{e.slot_code} dolu.")
+        pairs.append((e, slot))
+
+    new = [e for e in entries if e.pk is None]
+    existing = [e for e in entries if e.pk is not None]
+    if new and connection.features.can_return_rows_from_bulk_insert:
+        for e in new:
+            e.sync_photo_state()  # bulk_create save() cagirmaz
+        TireHotelEntry.objects.bulk_create(new, batch_size=500)
+    else:
+        for e in new:
+            e.save()
+    if fields:
+        TireHotelEntry.objects.bulk_update(existing, [*fields, "rack_code", "slot_code"], batch_size=500)
+    else:
+        for e in existing:
+            e.save()
+    if existing:
+        # Tasinan kayitlarin eski gozleri bosalir
+        (
+            TireSlot.objects.filter(entry__in=existing)
+            .exclude(pk__in=[s.pk for _, s in pairs])
+            .update(entry=None)
+        )
+    _occupy(pairs)
+
+
+def place_entries(branch_id: int, entries, fields=None) -> list:
+    """Kayitlari gozlere yerlestirip kaydeder (yeni kayitlar toplu INSERT).
+
+    rack_code/slot_code dolu olan kayit o goze (yerlesimde varsa bos olmali),
+    bos olanlar siradaki bos gozlere konur. Hepsi tek transaction'da; yaris
+    durumunda otomatik atananlar baska gozlerle tekrar denenir.
+    `fields` verilirse mevcut kayitlar tek tek save() yerine bulk_update ile
+    (bu alanlar + raf/goz) yazilir. Yer yoksa / goz doluysa SlotUnavailable.
+    """
+    entries = list(entries)
+    auto = [e for e in entries if not (e.rack_code and e.slot_code)]
+    new = [e for e in entries if e.pk is None]
+    tried = set()
+    for attempt in range(PLACE_RETRIES):
+        try:
+            with transaction.atomic():
+                _place(branch_id, entries, tried, fields)
+                bump_version(branch_id)
+            return entries
+        except (IntegrityError, _SlotConflict):
+            # Geri alinan denemenin izlerini temizle
+            for e in auto:
+                e.rack_code = e.slot_code = ""
+            for e in new:
+                e.pk = None
+                e._state.adding = True
+            if attempt == PLACE_RETRIES - 1 or not auto:
+                raise SlotUnavailable("Secilen goz baska bir kayda verildi, tekrar deneyin.")
+    return entries
+
+
+def place_entry(entry: TireHotelEntry) -> TireHotelEntry:
+    return place_entries(entry.branch_id, [entry])[0]
+
+
+def release_slot(entry: TireHotelEntry) -> None:
+    """Cikista gozu bosaltir (kayit aktif degil artik)."""
+    release_slots(entry.branch_id, [entry])
+
+
+def release_slots(branch_id: int, entries) -> None:
+    TireSlot.objects.filter(entry__in=list(entries)).update(entry=None)
+    bump_version(branch_id)
+
+
+# -------------------------
+# Toplu giris / cikis (sezon degisimi)
+# -------------------------
+LABEL_CODE_RE = re.compile(rf"^(?:{LABEL_PREFIX})?[-#]?0*(\d+)$")
+
+
+def parse_entry_refs(raw) -> tuple:
+    """Kayit id'leri / okutulan etiket kodlari ('TH000123', '#123', '123') -> (id listesi, gecersizler).
+
+    Satir, bosluk, virgul veya noktali virgulle ayrilabilir; tekrarlar bir kez sayilir.
+    """
+    if isinstance(raw, str):
+        raw = re.split(r"[\s,;]+", raw)
+    ids, invalid = [], []
+    for token in raw:
+        token = str(token).strip().upper()
+        if not token:
+            continue
+        m = LABEL_CODE_RE.match(token)
+        if not m:
+            invalid.append(token)
+            continue
+        pk = int(m.group(1))
+        if pk not in ids:
+            ids.append(pk)
+    return ids, invalid
+
+
+@dataclass
+class BulkResult:
+    action: str
+    done: list = field(default_factory=list)  # islenen TireHotelEntry'ler
+    skipped: list = field(default_factory=list)  # (kod, neden)
+    notified: int = 0
+    seconds: float = 0.0
+
+    def __str__(self):
+        return (
+            f"{self.action}: islendi={len(self.done)} atlandi={len(self.skipped)} "
+            f"bildirim={self.notified} sure={self.seconds:.2f}sn"
+        )
+
+
+def _lock_entries(branch_id: int, ids) -> dict:
+    qs = (
+        TireHotelEntry.objects.filter(branch_id=branch_id, pk__in=ids)
+        .select_related("customer")
+        .select_for_update(of=("self",))
+    )
+    return {e.pk: e for e in qs}
+
+
+def _split(result: BulkResult, ids, invalid, found: dict, want_active: bool, reason: str) -> list:
+    result.skipped += [(token, "Gecersiz kod") for token in invalid]
+    entries = []
+    for pk in ids:
+        e = found.get(pk)
+        if e is None:
+            result.skipped.append((label_code(pk), "Bulunamadi"))
+        elif e.is_active != want_active:
+            result.skipped.append((label_code(pk), reason))
+        else:
+            entries.append(e)
+    return entries
+
+
+def bulk_checkout(branch_id: int, refs) -> BulkResult:
+    """Depodaki kayitlarin toplu cikisi: tek transaction, bulk_update, bildirimler tek bulk_create."""
+    started = time.monotonic()
+    result = BulkResult(action="cikis")
+    ids, invalid = parse_entry_refs(refs)
+    today = timezone.localdate()
+    with transaction.atomic():
+        entries = _split(result, ids, invalid, _lock_entries(branch_id, ids), True, "Zaten cikmis")
+        for e in entries:
+            e.is_active = False
+            e.released_at = today
+        TireHotelEntry.objects.bulk_update(entries, ["is_active", "released_at"], batch_size=500)
+        release_slots(branch_id, entries)
+        result.notified = enqueue_tirehotel_batch(entries, "delivered")
+    result.done = entries
+    result.seconds = time.monotonic() - started
+    return result
+
+
+def bulk_checkin(branch_id: int, refs, due_at=None) -> BulkResult:
+    """Cikmis kayitlarin yeni sezonda toplu tekrar girisi: siradaki bos gozler atanir.
+
+    Yeterli bos goz yoksa hicbiri islenmez (SlotUnavailable). due_at verilmezse
+    gecen sezonun son tarihi tasinmaz, bos birakilir.
+    """
+    started = time.monotonic()
+    result = BulkResult(action="giris")
+    ids, invalid = parse_entry_refs(refs)
+    today = timezone.localdate()
+    with transaction.atomic():
+        entries = _split(result, ids, invalid, _lock_entries(branch_id, ids), False, "Zaten depoda")
+        for e in entries:
+            e.is_active = True
+            e.received_at = today
+            e.released_at = None
+            e.rack_code = e.slot_code = ""
+            e.due_at = due_at
+        fields = ["is_active", "received_at", "released_at", "due_at"]
+        if entries:
+            place_entries(branch_id, entries, fields=fields)
+        result.notified = enqueue_tirehotel_batch(entries, "received")
+    result.done = entries
+    result.seconds = time.monotonic() - started
+    return result
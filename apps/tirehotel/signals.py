@@ -0,0 +1,13 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.tirehotel.models import TireHotelEntry, TireRack
+from apps.tirehotel.occupancy import bump_version
+
+
+@receiver(post_save, sender=TireHotelEntry)
+@receiver(post_delete, sender=TireHotelEntry)
+@receiver(post_delete, sender=TireRack)
+def _layout_changed(sender, instance, **kwargs):
+    # Doluluk haritasi (occupancy.py) bu subede yeniden kurulsun
+    bump_version(instance.branch_id)
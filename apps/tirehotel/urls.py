@@ -3,6 +3,10 @@ from . import views
 
 urlpatterns = [
     path("", views.tire_list, name="tire_list"),
+    # depo haritasi (raf/goz doluluk)
+    path("map/", views.tire_map, name="tire_map"),
+    # toplu giris/cikis (etiket okutma)
+    path("bulk/", views.tire_bulk, name="tire_bulk"),
     # ✅ create (modal ve sayfa icin)
     path("new/", views.tire_create, name="tire_create"),
     path("create/", views.tire_create, name="tire_create_alias"),
@@ -1,24 +1,113 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import redirect, render, get_object_or_404
 from django.contrib import messages
+from django.db import transaction
 from django.utils import timezone
-from datetime import datetime
+from datetime import datetime, timedelta
 from django.http import HttpResponse
+from urllib.parse import urlencode
+import re
+
+from apps.core.pagination import keyset_page
 
 from apps.core.models import Branch
 from apps.customers.models import Customer, Vehicle
 from .models import TireHotelEntry
 from .forms import TireHotelCreateForm
-from apps.notifications.triggers import on_tirehotel_created, on_tirehotel_delivered
+from .occupancy import get_map
+from .services import (
+    RACK_PREFIX,
+    SLOT_PREFIX,
+    SlotUnavailable,
+    bulk_checkin,
+    bulk_checkout,
+    normalize_code,
+    place_entry,
+    release_slot,
+)
+from apps.notifications.triggers import notify_safely, on_tirehotel_created, on_tirehotel_delivered
+
+
+STATUS_FILTERS = [("", "Depoda"), ("RELEASED", "Çıkanlar"), ("ALL", "Tümü")]
+DUE_FILTERS = [("", "Tümü"), ("overdue", "Süresi geçmiş"), ("7", "7 gün içinde"), ("30", "30 gün içinde")]
+SIZE_RE = re.compile(r"\d+/\d+")
+
+
+def _filter_entries(request, branch_id):
+    """Liste filtreleri: status / season / due / q (GET).
+
+    Varsayilan: depodaki (aktif) kayitlar. q ebat gibi gorunuyorsa (205/55R16)
+    ebatta arar, yoksa plaka on-eki ((branch, plate_text) index'i).
+    """
+    qs = TireHotelEntry.objects.all()
+    if branch_id:
+        qs = qs.filter(branch_id=branch_id)
+
+    status = (request.GET.get("status") or "").strip().upper()
+    season = (request.GET.get("season") or "").strip().upper()
+    due = (request.GET.get("due") or "").strip().lower()
+    q = (request.GET.get("q") or "").strip()
+
+    if status == "RELEASED":
+        qs = qs.filter(is_active=False)
+    elif status != "ALL":
+        status = ""
+        qs = qs.filter(is_active=True)
+    if season in dict(TireHotelEntry.SEASON_CHOICES):
+        qs = qs.filter(season=season)
+    else:
+        season = ""
+
+    today = timezone.localdate()
+    if due not in {value for value, _ in DUE_FILTERS}:
+        due = ""
+    if due == "overdue":
+        qs = qs.filter(due_at__lt=today)
+    elif due:
+        qs = qs.filter(due_at__range=(today, today + timedelta(days=int(due))))
+
+    if q:
+        if SIZE_RE.search(q):
+            qs = qs.filter(size__icontains=q)
+        else:
+            qs = qs.filter(plate_text__startswith=q.upper())
+
+    filters = {"status": status, "season": season, "due": due, "q": q}
+    return qs, filters
 
 
 @login_required
 def tire_list(request):
     branch_id = request.session.get("active_branch_id")
-    qs = TireHotelEntry.objects.all().order_by("-created_at")
-    if branch_id:
-        qs = qs.filter(branch_id=branch_id)
-    return render(request, "tirehotel/tire_list.html", {"items": qs})
+    qs, filters = _filter_entries(request, branch_id)
+    page_size = int(getattr(settings, "TIREHOTEL_PAGE_SIZE", 50))
+    page = keyset_page(qs, request.GET.get("cursor", ""), page_size=page_size)
+
+    params = {k: v for k, v in filters.items() if v}
+    next_url = ""
+    if page.has_next:
+        next_url = "?" + urlencode({**params, "cursor": page.next_cursor})
+    return render(request, "tirehotel/tire_list.html", {
+        "items": page.items,
+        "filters": filters,
+        "status_filters": STATUS_FILTERS,
+        "due_filters": DUE_FILTERS,
+        "season_choices": TireHotelEntry.SEASON_CHOICES,
+        "next_url": next_url,
+        "first_url": "?" + urlencode(params) if params else "?",
+        "is_first_page": not request.GET.get("cursor"),
+    })
+
+
+@login_required
+def tire_map(request):
+    """Depo1 raf/goz haritasi: bos / dolu / son tarihi yaklasan / gecmis (cache'li)."""
+    branch_id = request.session.get("active_branch_id")
+    if not branch_id:
+        messages.error(request, "Once aktif sube secmelisin.")
+        return redirect("dashboard")
+    return render(request, "tirehotel/tire_map.html", {"map": get_map(branch_id)})
 
 
 @login_required
@@ -46,17 +135,11 @@ def tire_create(request):
         # price
         if not post.get("price") and post.get("fee"):
             post["price"] = post.get("fee")
-        # rack/slot
-        if not post.get("rack_code") and post.get("rack"):
-            post["rack_code"] = f"R{post.get('rack')}" if post.get("rack") and not str(post.get('rack')).startswith("R") else post.get("rack")
-        if not post.get("slot_code") and post.get("slot"):
-            post["slot_code"] = f"G{post.get('slot')}" if post.get("slot") and not str(post.get('slot')).startswith("G") else post.get("slot")
+        # rack/slot (bos kalirsa kayitta siradaki bos goz atanir)
+        post["rack_code"] = normalize_code(post.get("rack_code") or post.get("rack"), RACK_PREFIX)
+        post["slot_code"] = normalize_code(post.get("slot_code") or post.get("slot"), SLOT_PREFIX)
 
         # ✅ Zorunlu alanlar gelmiyorsa default ver (hızlı kayıt için)
-        if not post.get("rack_code"):
-            post["rack_code"] = "R1"
-        if not post.get("slot_code"):
-            post["slot_code"] = "G1"
         if not post.get("price"):
             post["price"] = "0"
         # brand/size from tire_text (best-effort)
@@ -90,9 +173,16 @@ def tire_create(request):
             if not obj.received_at:
                 obj.received_at = timezone.localdate()
             obj.is_active = True
-            obj.save()
-            messages.success(request, "Lastik otel kaydi olusturuldu.")
-            on_tirehotel_created(obj)
+            # goz atama + kayit + bildirim (outbox) ayni transaction'da;
+            # bildirim kendi savepoint'inde, hatasi kaydi geri almaz
+            try:
+                with transaction.atomic():
+                    place_entry(obj)
+                    notify_safely(on_tirehotel_created, obj)
+            except SlotUnavailable as e:
+                messages.error(request, str(e))
+                return redirect("tire_list")
+            messages.success(request, f"Lastik otel kaydi olusturuldu: {obj.rack_code}/{obj.slot_code}")
             return redirect("tire_list")
         else:
             messages.error(request, "Form hatasi: " + str(form.errors))
@@ -108,12 +198,45 @@ def tire_checkout(request, pk: int):
     obj = get_object_or_404(TireHotelEntry, pk=pk)
     obj.is_active = False
     obj.released_at = timezone.localdate()
-    obj.save(update_fields=["is_active", "released_at"])
+    with transaction.atomic():
+        obj.save(update_fields=["is_active", "released_at"])
+        release_slot(obj)
+        notify_safely(on_tirehotel_delivered, obj)
     messages.success(request, "Cikis yapildi.")
-    on_tirehotel_delivered(obj)
     return redirect("tire_list")
 
 
+@login_required
+def tire_bulk(request):
+    """Sezon degisimi: okutulan etiket kodlari / kayit no'lari ile toplu cikis veya giris.
+
+    Tek transaction + bulk_update; bildirimler outbox'a tek seferde yazilir.
+    """
+    branch_id = request.session.get("active_branch_id")
+    if not branch_id:
+        messages.error(request, "Once aktif sube secmelisin.")
+        return redirect("dashboard")
+
+    action = request.POST.get("action") or request.GET.get("action") or "checkout"
+    result = None
+    if request.method == "POST":
+        codes = request.POST.get("codes", "")
+        due_at = None
+        if request.POST.get("due_at"):
+            try:
+                due_at = datetime.fromisoformat(request.POST.get("due_at")).date()
+            except ValueError:
+                pass
+        try:
+            if action == "checkin":
+                result = bulk_checkin(branch_id, codes, due_at=due_at)
+            else:
+                result = bulk_checkout(branch_id, codes)
+        except SlotUnavailable as e:
+            messages.error(request, str(e))
+    return render(request, "tirehotel/tire_bulk.html", {"result": result, "action": action})
+
+
 @login_required
 def tire_deliver(request, pk: int):
     """Panelden teslim."""
@@ -135,8 +258,9 @@ def tire_edit(request, pk: int):
         qty_raw = (post.get("qty") or "").strip()
         if qty_raw.isdigit():
             obj.qty = int(qty_raw)
-        rack = post.get("rack_code") or post.get("rack")
-        slot = post.get("slot_code") or post.get("slot")
+        rack = normalize_code(post.get("rack_code") or post.get("rack"), RACK_PREFIX)
+        slot = normalize_code(post.get("slot_code") or post.get("slot"), SLOT_PREFIX)
+        moved = (rack and rack != obj.rack_code) or (slot and slot != obj.slot_code)
         if rack:
             obj.rack_code = rack
         if slot:
@@ -154,7 +278,15 @@ def tire_edit(request, pk: int):
                 obj.due_at = datetime.fromisoformat(post.get("due_at")).date()
             except Exception:
                 pass
-        obj.save()
+        if moved and obj.is_active:
+            # Yeni goz bos olmali; eski goz bosalir
+            try:
+                place_entry(obj)
+            except SlotUnavailable as e:
+                messages.error(request, str(e))
+                return redirect("tire_list")
+        else:
+            obj.save()
         messages.success(request, "Lastik kaydi guncellendi ✅")
     return redirect("tire_list")
 
@@ -5,3 +5,6 @@ class WorkordersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.workorders"
     verbose_name = "Is Emirleri"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from apps.workorders.models import WorkOrder
+
+
+class Command(BaseCommand):
+    help = "WorkOrder.plate_key alanini plate_text / arac plakasindan yeniden hesaplar"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch", type=int, default=1000, help="bulk_update parti boyutu")
+        parser.add_argument("--dry-run", action="store_true", help="Sadece farkli olanlari say, yazma")
+
+    def handle(self, *args, **options):
+        batch_size = options.get("batch") or 1000
+        dry_run = options.get("dry_run")
+
+        qs = WorkOrder.objects.select_related("vehicle").only("id", "plate_text", "plate_key", "vehicle__plate").order_by("id")
+        changed = 0
+        batch = []
+        for o in qs.iterator(chunk_size=batch_size):
+            key = o.compute_plate_key()
+            if key == o.plate_key:
+                continue
+            o.plate_key = key
+            changed += 1
+            if dry_run:
+                continue
+            batch.append(o)
+            if len(batch) >= batch_size:
+                WorkOrder.objects.bulk_update(batch, ["plate_key"])
+                batch = []
+        if batch:
+            WorkOrder.objects.bulk_update(batch, ["plate_key"])
+
+        verb = "guncellenecek" if dry_run else "guncellendi"
+        self.stdout.write(self.style.SUCCESS(f"OK: {changed} is emri {verb}"))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from apps.workorders.models import WorkOrder
+from apps.workorders.services import drifted_totals, recalc_totals
+
+
+class Command(BaseCommand):
+    help = "parts_total / grand_total satirlarla tutmayan is emirlerini partiler halinde duzeltir"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch", type=int, default=1000, help="Parti boyutu (id araligi)")
+        parser.add_argument("--branch", type=int, default=None, help="Sadece bu sube")
+        parser.add_argument("--dry-run", action="store_true", help="Sadece say, yazma")
+
+    def handle(self, *args, **options):
+        batch_size = options.get("batch") or 1000
+        dry_run = options.get("dry_run")
+
+        base = WorkOrder.objects.all()
+        if options.get("branch"):
+            base = base.filter(branch_id=options["branch"])
+
+        fixed = 0
+        last_id = 0
+        while True:
+            ids = list(base.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:batch_size])
+            if not ids:
+                break
+            last_id = ids[-1]
+            bad = list(drifted_totals(WorkOrder.objects.filter(id__in=ids)).values_list("id", flat=True))
+            if bad and not dry_run:
+                recalc_totals(bad)
+            fixed += len(bad)
+
+        verb = "tutarsiz" if dry_run else "duzeltildi"
+        self.stdout.write(self.style.SUCCESS(f"OK: {fixed} is emri {verb}"))
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_plate_key(apps, schema_editor):
+    WorkOrder = apps.get_model("workorders", "WorkOrder")
+    batch = []
+    for o in WorkOrder.objects.select_related("vehicle").only("id", "plate_text", "vehicle__plate").iterator(chunk_size=1000):
+        plate = (o.plate_text or "").strip() or (o.vehicle.plate if o.vehicle_id and o.vehicle else "")
+        o.plate_key = "".join((plate or "").split()).upper()
+        batch.append(o)
+        if len(batch) >= 1000:
+            WorkOrder.objects.bulk_update(batch, ["plate_key"])
+            batch = []
+    if batch:
+        WorkOrder.objects.bulk_update(batch, ["plate_key"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('customers', '0002_alter_customer_email_alter_customer_notes_and_more'),
+        ('workorders', '0006_workorder_assigned_to_workorder_worker_finished_at_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workorder',
+            name='plate_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='workorder',
+            name='status',
+            field=models.CharField(choices=[('WAITING', 'Beklemede'), ('IN_PROGRESS', 'İşlemde'), ('WAITING_ADMIN', 'Admin Bekliyor'), ('DONE', 'Teslim')], default='WAITING', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='workorder',
+            index=models.Index(fields=['branch', 'plate_key', 'status', 'created_at'], name='workorders__branch__617a9e_idx'),
+        ),
+        migrations.RunPython(fill_plate_key, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workorders', '0009_workorder_branch_status_finished_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workorder',
+            name='parts_cost',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+    ]
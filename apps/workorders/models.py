@@ -5,6 +5,11 @@ from apps.core.models import Branch
 from apps.customers.models import Customer, Vehicle
 
 
+def normalize_plate(value) -> str:
+    """Plakayi karsilastirma anahtarina cevirir: bosluksuz + buyuk harf."""
+    return "".join((value or "").split()).upper()
+
+
 class WorkOrder(models.Model):
     KIND_CAR_WASH = "CAR_WASH"
     KIND_VEHICLE_REPAIR = "VEHICLE_REPAIR"
@@ -34,6 +39,8 @@ class WorkOrder(models.Model):
     customer = models.ForeignKey(Customer, on_delete=models.SET_NULL, null=True, blank=True)
     vehicle = models.ForeignKey(Vehicle, on_delete=models.SET_NULL, null=True, blank=True)
     plate_text = models.CharField(max_length=20, blank=True, help_text="Araç kaydı yoksa plaka")
+    # Tekrar gelis sorgulari icin normalize plaka (save() ile senkron tutulur)
+    plate_key = models.CharField(max_length=20, blank=True, default="", editable=False)
 
     complaint = models.TextField(blank=True, default="")
     km = models.PositiveIntegerField(null=True, blank=True)
@@ -42,6 +49,8 @@ class WorkOrder(models.Model):
     labor_total = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     parts_total = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     grand_total = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    # Parça maliyeti (satırların kullanım anındaki birim maliyetinden; kârlılık raporu için)
+    parts_cost = models.DecimalField(max_digits=10, decimal_places=2, default=0)
 
     payment_method = models.CharField(max_length=20, blank=True, default="", help_text="NAKIT/KART/HAVALE")
     is_paid = models.BooleanField(default=False)
@@ -69,10 +78,30 @@ class WorkOrder(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["branch", "plate_key", "status", "created_at"]),
+            models.Index(fields=["branch", "created_at", "id"]),
+            models.Index(fields=["branch", "status", "finished_at"]),
+        ]
+
     def __str__(self):
         plate = (self.plate_text or "").strip() or (self.vehicle.plate if self.vehicle else "-")
         return f"{plate} - {self.get_kind_display()}"
 
+    def compute_plate_key(self) -> str:
+        plate = (self.plate_text or "").strip()
+        if not plate and self.vehicle_id:
+            plate = self.vehicle.plate or ""
+        return normalize_plate(plate)
+
+    def save(self, *args, **kwargs):
+        self.plate_key = self.compute_plate_key()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"plate_text", "vehicle"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "plate_key"}
+        super().save(*args, **kwargs)
+
 
 class WorkOrderItem(models.Model):
     order = models.ForeignKey(WorkOrder, on_delete=models.CASCADE, related_name="items")
@@ -0,0 +1,152 @@
+import datetime
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, Exists, ExpressionWrapper, F, Max, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import WorkOrder, normalize_plate
+
+DECIMAL = DecimalField(max_digits=12, decimal_places=2)
+DEC0 = Decimal("0.00")
+
+
+def last_done_visits(branch_id, plate_keys, days: int = 30, exclude_ids=()) -> dict:
+    """Son `days` gun icindeki DONE is emirlerini plakaya gore tek sorguda toplar.
+
+    Donus: {plate_key: {"last_id", "last_date", "count"}}
+    (branch, plate_key, status, created_at) index'i uzerinden calisir.
+    """
+    keys = {normalize_plate(k) for k in plate_keys}
+    keys.discard("")
+    if not keys:
+        return {}
+
+    since = timezone.now() - datetime.timedelta(days=days)
+    qs = WorkOrder.objects.filter(status=WorkOrder.STATUS_DONE, created_at__gte=since, plate_key__in=keys)
+    if branch_id:
+        qs = qs.filter(branch_id=branch_id)
+    if exclude_ids:
+        qs = qs.exclude(pk__in=list(exclude_ids))
+
+    rows = (
+        qs.values("plate_key")
+        .annotate(last_id=Max("id"), last_date=Max("created_at"), count=Count("id"))
+        .order_by()
+    )
+    return {
+        r["plate_key"]: {"last_id": r["last_id"], "last_date": r["last_date"], "count": r["count"]}
+        for r in rows
+    }
+
+
+def mark_repeat_visits(items, branch_id, days: int = 30) -> None:
+    """Listedeki her kayda `is_repeat` isler (tek sorgu).
+
+    Kaydin kendisi DONE ise kendini tekrar gelis saymaz.
+    """
+    visits = last_done_visits(branch_id, (o.plate_key for o in items), days=days)
+    for o in items:
+        hit = visits.get(o.plate_key)
+        o.is_repeat = bool(hit) and (hit["last_id"] != o.id or hit["count"] > 1)
+
+
+def repeat_visit_info(order: WorkOrder, days: int = 30):
+    """Ayni plakanin son `days` gun icindeki son DONE is emri (kendisi haric)."""
+    if not order.plate_key:
+        return None
+    hit = last_done_visits(order.branch_id, [order.plate_key], days=days, exclude_ids=[order.pk]).get(order.plate_key)
+    if not hit:
+        return None
+    delta_days = (timezone.now().date() - hit["last_date"].date()).days
+    return {"last_id": hit["last_id"], "last_date": hit["last_date"], "delta_days": delta_days}
+
+
+# -------------------------
+# Toplamlar (parts_total / grand_total / parts_cost)
+# -------------------------
+def _lines_parts_total():
+    """Satırlardan parça toplamı: WorkOrderPart.line_total + WorkOrderItem(is_part) qty*unit_price."""
+    from apps.inventory.models import WorkOrderPart
+
+    from .models import WorkOrderItem
+
+    wop = (
+        WorkOrderPart.objects.filter(order=OuterRef("pk"))
+        .order_by().values("order")
+        .annotate(s=Sum("line_total")).values("s")
+    )
+    items = (
+        WorkOrderItem.objects.filter(order=OuterRef("pk"), is_part=True)
+        .order_by().values("order")
+        .annotate(s=Sum(ExpressionWrapper(F("qty") * F("unit_price"), output_field=DECIMAL))).values("s")
+    )
+    return (
+        Coalesce(Subquery(wop, output_field=DECIMAL), DEC0, output_field=DECIMAL)
+        + Coalesce(Subquery(items, output_field=DECIMAL), DEC0, output_field=DECIMAL)
+    )
+
+
+def _lines_parts_cost():
+    """Satırlardan parça maliyeti: WorkOrderPart.qty * unit_cost (snapshot)."""
+    from apps.inventory.models import WorkOrderPart
+
+    cost = (
+        WorkOrderPart.objects.filter(order=OuterRef("pk"))
+        .order_by().values("order")
+        .annotate(s=Sum(ExpressionWrapper(F("qty") * F("unit_cost"), output_field=DECIMAL))).values("s")
+    )
+    return Coalesce(Subquery(cost, output_field=DECIMAL), DEC0, output_field=DECIMAL)
+
+
+def _has_part_lines():
+    from apps.inventory.models import WorkOrderPart
+
+    from .models import WorkOrderItem
+
+    return Q(Exists(WorkOrderPart.objects.filter(order=OuterRef("pk")))) | Q(
+        Exists(WorkOrderItem.objects.filter(order=OuterRef("pk"), is_part=True))
+    )
+
+
+def recalc_totals(order_ids) -> int:
+    """parts_total / grand_total'ı DB tarafında yeniden hesaplar (satır Python'a çekilmez).
+
+    Parça satırı olan emirlerde parts_total satırlardan gelir; satırı olmayanlarda
+    elle girilen parts_total korunur. grand_total = labor_total + parts_total.
+    parts_cost her zaman satırların snapshot maliyetinden (qty * unit_cost) gelir.
+    """
+    ids = [order_ids] if isinstance(order_ids, int) else list(order_ids)
+    if not ids:
+        return 0
+    qs = WorkOrder.objects.filter(pk__in=ids)
+    now = timezone.now()
+    qs.filter(_has_part_lines()).update(parts_total=_lines_parts_total(), updated_at=now)
+    qs.update(parts_cost=_lines_parts_cost())
+    return qs.update(grand_total=F("labor_total") + F("parts_total"))
+
+
+def apply_line_totals(order: WorkOrder) -> None:
+    """Kaydetmeden önce: parça satırı varsa parts_total'ı satırlardan (DB aggregate) al,
+    parts_cost ve grand_total'ı yeniden kur. Tek save() -> post_save dinleyicileri doğru toplamı görür.
+    """
+    if order.pk:
+        row = (
+            WorkOrder.objects.filter(pk=order.pk)
+            .annotate(lp=_lines_parts_total(), lc=_lines_parts_cost(), has_lines=_has_part_lines())
+            .values("lp", "lc", "has_lines").first()
+        )
+        if row:
+            order.parts_cost = row["lc"]
+            if row["has_lines"]:
+                order.parts_total = row["lp"]
+    order.grand_total = (order.labor_total or DEC0) + (order.parts_total or DEC0)
+
+
+def drifted_totals(qs):
+    """Toplamı satırlarla / labor+parts ile tutmayan emirler."""
+    return qs.alias(expected_parts=_lines_parts_total(), expected_cost=_lines_parts_cost()).filter(
+        (_has_part_lines() & ~Q(parts_total=F("expected_parts")))
+        | ~Q(grand_total=F("labor_total") + F("parts_total"))
+        | ~Q(parts_cost=F("expected_cost"))
+    )
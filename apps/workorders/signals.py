@@ -0,0 +1,28 @@
+from django.db.models.functions import Trim
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.customers.models import Vehicle
+from .models import WorkOrder, WorkOrderItem, normalize_plate
+from .services import recalc_totals
+
+
+@receiver(post_save, sender=WorkOrderItem)
+@receiver(post_delete, sender=WorkOrderItem)
+def _item_changed(sender, instance, **kwargs):
+    recalc_totals(instance.order_id)
+
+
+@receiver(post_save, sender=Vehicle)
+def _vehicle_saved(sender, instance, created, **kwargs):
+    # plate_text'i bos emirlerin plate_key'i arac plakasindan gelir (compute_plate_key)
+    if created:
+        return
+    key = normalize_plate(instance.plate)
+    (
+        WorkOrder.objects.filter(vehicle=instance)
+        .annotate(plate_text_trim=Trim("plate_text"))
+        .filter(plate_text_trim="")
+        .exclude(plate_key=key)
+        .update(plate_key=key)
+    )
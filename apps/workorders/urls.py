@@ -9,6 +9,7 @@ urlpatterns = [
     # işlemler
     path("<int:pk>/done/", views.workorder_done, name="workorder_done"),
     path("<int:pk>/edit/", views.workorder_edit, name="workorder_edit"),
+    path("<int:pk>/modal/<str:kind>/", views.workorder_modal, name="workorder_modal"),
 
     # print
     path("<int:pk>/print/", views.workorder_print, name="workorder_print"),
@@ -3,10 +3,16 @@ from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import Group
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from django.db import transaction
+from django.db.models import Count, Max, Q
 from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from urllib.parse import urlencode
 import datetime
+import hashlib
 
 # ---- Sabit servis şablonları (Usta ekranı) ----
 SERVICES_CATALOG = [
@@ -25,8 +31,10 @@ SERVICES_CATALOG = [
 from apps.core.roles import is_admin, is_worker
 from apps.customers.models import Customer, Vehicle
 from apps.core.models import Branch
-from apps.notifications.triggers import on_workorder_done, on_workorder_created
+from apps.notifications.triggers import notify_safely, on_workorder_done, on_workorder_created
 from .models import WorkOrder
+from .services import apply_line_totals, mark_repeat_visits, repeat_visit_info
+from apps.core.pagination import keyset_page
 from apps.core.permissions import admin_required, worker_required
 
 
@@ -39,70 +47,88 @@ def get_default_worker():
         return None
 
 
-def _plate_of(o: WorkOrder) -> str:
-    plate = (getattr(o, "plate_text", "") or "").strip()
-    if not plate and getattr(o, "vehicle_id", None) and o.vehicle:
-        plate = (o.vehicle.plate or "").strip()
-    return (plate or "").upper()
-
-
-def repeat_visit_info(order: WorkOrder, days: int = 30):
-    """Return dict about last DONE workorder for same plate within `days` (excluding itself)."""
-    plate = _plate_of(order)
-    if not plate:
-        return None
-    since = timezone.now() - datetime.timedelta(days=days)
-    qs = WorkOrder.objects.filter(created_at__gte=since).exclude(pk=order.pk)
-    # same branch scope to avoid noise
-    if getattr(order, "branch_id", None):
-        qs = qs.filter(branch_id=order.branch_id)
-    qs = qs.filter(status=WorkOrder.STATUS_DONE).select_related("vehicle").order_by("-created_at")
-    # match by plate_text or vehicle plate
-    hit = None
-    for cand in qs[:50]:
-        if _plate_of(cand) == plate:
-            hit = cand
-            break
-    if not hit:
-        return None
-    delta_days = (timezone.now().date() - hit.created_at.date()).days
-    return {"last_id": hit.id, "last_date": hit.created_at, "delta_days": delta_days}
-
-
-
-
-
 # -------------------------
 # ADMIN: Liste
 # -------------------------
-@login_required
-def workorders_new(request):
-    branch_id = request.session.get("active_branch_id")
-    qs = WorkOrder.objects.select_related("customer", "vehicle").order_by("-created_at")
+def _parse_date(raw):
+    try:
+        return datetime.date.fromisoformat((raw or "").strip())
+    except ValueError:
+        return None
+
+
+def _filter_workorders(request, branch_id):
+    """Liste filtreleri: status / kind / start / end (GET).
 
+    Hiç filtre yoksa varsayılan görünüm: açık işler + son N gün.
+    """
+    qs = WorkOrder.objects.select_related("customer", "vehicle")
     if branch_id:
         qs = qs.filter(branch_id=branch_id)
-    # --- tekrar geliş uyarısı (son 30 gün içinde DONE varsa) ---
-    plates = []
-    for it in qs.select_related("vehicle")[:200]:
-        p = _plate_of(it)
-        if p:
-            plates.append(p)
-    plates = list(dict.fromkeys(plates))
-    since = timezone.now() - datetime.timedelta(days=30)
-    recent_done = WorkOrder.objects.filter(status=WorkOrder.STATUS_DONE, created_at__gte=since).select_related("vehicle")
-    if branch_id:
-        recent_done = recent_done.filter(branch_id=branch_id)
-    done_plates = set(_plate_of(x) for x in recent_done[:2000])
-    repeat_map = {p: (p in done_plates) for p in plates}
+
+    status = (request.GET.get("status") or "").strip()
+    kind = (request.GET.get("kind") or "").strip()
+    start = _parse_date(request.GET.get("start"))
+    end = _parse_date(request.GET.get("end"))
+
+    if not (status or kind or start or end):
+        days = int(getattr(settings, "WORKORDERS_DEFAULT_DAYS", 30))
+        since = timezone.now() - datetime.timedelta(days=days)
+        qs = qs.filter(Q(created_at__gte=since) | ~Q(status=WorkOrder.STATUS_DONE))
+    else:
+        if status == "OPEN":
+            qs = qs.exclude(status=WorkOrder.STATUS_DONE)
+        elif status in dict(WorkOrder.STATUS_CHOICES):
+            qs = qs.filter(status=status)
+        if kind in dict(WorkOrder.KIND_CHOICES):
+            qs = qs.filter(kind=kind)
+        # created_at__date yerine aralık: (branch, created_at, id) index'i kullanılabilsin
+        tz = timezone.get_current_timezone()
+        if start:
+            qs = qs.filter(created_at__gte=datetime.datetime.combine(start, datetime.time.min, tzinfo=tz))
+        if end:
+            qs = qs.filter(created_at__lt=datetime.datetime.combine(end + datetime.timedelta(days=1), datetime.time.min, tzinfo=tz))
+
+    filters = {
+        "status": status,
+        "kind": kind,
+        "start": start.isoformat() if start else "",
+        "end": end.isoformat() if end else "",
+    }
+    return qs, filters
+
+
+def _workorders_page_context(request, branch_id):
+    qs, filters = _filter_workorders(request, branch_id)
+    page_size = int(getattr(settings, "WORKORDERS_PAGE_SIZE", 50))
+    page = keyset_page(qs, request.GET.get("cursor", ""), page_size=page_size)
 
     # Django template icinde dict.get(plate|upper) gibi ifadeler parse edilemiyor.
     # Bu yuzden tekrar-ziyaret bilgisini view tarafinda her kayda isliyoruz.
-    items = list(qs)
-    for o in items:
-        o.is_repeat = bool(repeat_map.get(_plate_of(o)))
+    items = page.items
+    # --- tekrar geliş uyarısı (son 30 gün içinde DONE varsa) ---
+    mark_repeat_visits(items, branch_id, days=30)
+
+    params = {k: v for k, v in filters.items() if v}
+    next_url = ""
+    if page.has_next:
+        next_url = "?" + urlencode({**params, "cursor": page.next_cursor})
+    return {
+        "items": items,
+        "filters": filters,
+        "status_choices": WorkOrder.STATUS_CHOICES,
+        "kind_choices": WorkOrder.KIND_CHOICES,
+        "next_url": next_url,
+        "first_url": "?" + urlencode(params) if params else "?",
+        "is_first_page": not request.GET.get("cursor"),
+    }
 
-    return render(request, "workorders/workorders_list.html", {"items": items})
+
+@login_required
+def workorders_new(request):
+    branch_id = request.session.get("active_branch_id")
+    ctx = _workorders_page_context(request, branch_id)
+    return render(request, "workorders/workorders_list.html", ctx)
 
 
 @login_required
@@ -113,38 +139,10 @@ def workorders_list(request):
         return redirect(getattr(settings, "WORKER_HOME_URL", "/workorders/my/"))
 
     branch_id = request.session.get("active_branch_id")
-    qs = WorkOrder.objects.select_related("customer", "vehicle").order_by("-created_at")
-
-    if branch_id:
-        qs = qs.filter(branch_id=branch_id)
-
-    # --- tekrar geliş uyarısı (son 30 gün içinde DONE varsa) ---
-    plates = []
-    for it in qs.select_related("vehicle")[:200]:
-        p = _plate_of(it)
-        if p:
-            plates.append(p)
-    plates = list(dict.fromkeys(plates))
-
-    since = timezone.now() - datetime.timedelta(days=30)
-    recent_done = WorkOrder.objects.filter(
-        status=WorkOrder.STATUS_DONE,
-        created_at__gte=since
-    ).select_related("vehicle")
+    ctx = _workorders_page_context(request, branch_id)
+    items = ctx["items"]
 
-    if branch_id:
-        recent_done = recent_done.filter(branch_id=branch_id)
-
-    done_plates = set(_plate_of(x) for x in recent_done[:2000])
-    repeat_map = {p: (p in done_plates) for p in plates}
-
-    items = list(qs)
-
-    # ✅ 1) repeat flag
-    for o in items:
-        o.is_repeat = bool(repeat_map.get(_plate_of(o)))
-
-    # ✅ 2) güvenli plaka display (vehicle None olsa da patlamaz)
+    # ✅ güvenli plaka display (vehicle None olsa da patlamaz)
     for o in items:
         plate = ""
         try:
@@ -158,7 +156,7 @@ def workorders_list(request):
             plate = ""
         o.plate_display = plate
 
-    return render(request, "workorders/workorders_list.html", {"items": items})
+    return render(request, "workorders/workorders_list.html", ctx)
 
 
 # -------------------------
@@ -237,27 +235,25 @@ def workorder_create(request):
 
     worker = get_default_worker()
 
-    wo = WorkOrder.objects.create(
-        branch=branch,
-        kind=kind,
-        status=WorkOrder.STATUS_WAITING,
-        customer=customer,
-        vehicle=vehicle,
-        plate_text=plate,
-        complaint=complaint,
-        km=km,
-        payment_method=payment_method,
-        subject=subject,
-        labor_total=labor,
-        parts_total=parts,
-        grand_total=labor + parts,
-        assigned_to=worker,
-    )
-
-    try:
-        on_workorder_created(wo)
-    except Exception as e:
-        print("WhatsApp trigger failed (created):", e)
+    # iş emri + bildirim (outbox) aynı transaction'da; bildirim kendi savepoint'inde
+    with transaction.atomic():
+        wo = WorkOrder.objects.create(
+            branch=branch,
+            kind=kind,
+            status=WorkOrder.STATUS_WAITING,
+            customer=customer,
+            vehicle=vehicle,
+            plate_text=plate,
+            complaint=complaint,
+            km=km,
+            payment_method=payment_method,
+            subject=subject,
+            labor_total=labor,
+            parts_total=parts,
+            grand_total=labor + parts,
+            assigned_to=worker,
+        )
+        notify_safely(on_workorder_created, wo)
 
     messages.success(request, f"İş emri kaydedildi ✅ #{wo.id}")
     return redirect("/workorders/")
@@ -302,7 +298,8 @@ def workorder_edit(request, pk: int):
             except Exception:
                 pass
 
-        o.grand_total = (o.labor_total or Decimal("0.00")) + (o.parts_total or Decimal("0.00"))
+        # parça satırı varsa parts_total satırlardan gelir (form değeri değil)
+        apply_line_totals(o)
 
         if "is_paid" in request.POST:
             o.is_paid = (request.POST.get("is_paid") == "1")
@@ -341,23 +338,63 @@ def workorder_done(request, pk: int):
 
         o.labor_total = labor
         o.parts_total = parts
-        o.grand_total = labor + parts
+        apply_line_totals(o)
 
         o.status = WorkOrder.STATUS_DONE
         if not o.finished_at:
             o.finished_at = timezone.now()
-        o.save()
-
-        try:
-            on_workorder_done(o)
-        except Exception as e:
-            print("WhatsApp trigger failed (done):", e)
+        with transaction.atomic():
+            o.save()
+            notify_safely(on_workorder_done, o)
 
         messages.success(request, f"İş emri bitirildi ✅ Toplam: {o.grand_total} ₺")
 
     return redirect("/workorders/")
 
 
+# -------------------------
+# ADMIN: Satır modalları (fragment)
+# -------------------------
+MODAL_TEMPLATES = {
+    "detail": "workorders/partials/modal_detail.html",
+    "edit": "workorders/partials/modal_edit.html",
+    "done": "workorders/partials/modal_done.html",
+}
+
+
+def _modal_etag(request, pk: int, kind: str):
+    """Modalda gorunen is emri + musteri + parca satirlarindan tek sorguda tek dogrulayici.
+
+    Last-Modified kullanilmaz: musteri adi/telefonu degisince updated_at degismez.
+    """
+    if kind not in MODAL_TEMPLATES:
+        return None
+    row = (
+        WorkOrder.objects.filter(pk=pk)
+        .annotate(part_lines=Count("parts"), last_part=Max("parts__id"))
+        .values_list("updated_at", "customer_id", "customer__full_name", "customer__phone", "part_lines", "last_part")
+        .first()
+    )
+    if not row:
+        return None
+    digest = hashlib.md5(repr(row).encode(), usedforsecurity=False).hexdigest()[:16]
+    return f"wo-{pk}-{kind}-{digest}"
+
+
+@login_required
+@admin_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_modal_etag)
+def workorder_modal(request, pk: int, kind: str):
+    """Listede tıklanan satırın modalı; iş emri / müşteri değişmedikçe 304 döner."""
+    template = MODAL_TEMPLATES.get(kind)
+    if not template:
+        raise Http404
+    o = get_object_or_404(WorkOrder.objects.select_related("customer"), pk=pk)
+    parts = list(o.parts.select_related("part").order_by("id")) if kind == "edit" else []
+    return render(request, template, {"o": o, "parts": parts})
+
+
 # -------------------------
 # PRINT / PDF
 # -------------------------
@@ -437,23 +474,9 @@ def my_workorders(request):
     # Eğer "tek usta her işi görsün" istiyorsan böyle kalsın.
     # Eğer "sadece assigned_to kendisi" istiyorsan:
     # qs = qs.filter(assigned_to=request.user)
-    # --- tekrar geliş uyarısı (son 30 gün içinde DONE varsa) ---
-    plates = []
-    for it in qs.select_related("vehicle")[:200]:
-        p = _plate_of(it)
-        if p:
-            plates.append(p)
-    plates = list(dict.fromkeys(plates))
-    since = timezone.now() - datetime.timedelta(days=30)
-    recent_done = WorkOrder.objects.filter(status=WorkOrder.STATUS_DONE, created_at__gte=since).select_related("vehicle")
-    if branch_id:
-        recent_done = recent_done.filter(branch_id=branch_id)
-    done_plates = set(_plate_of(x) for x in recent_done[:2000])
-    repeat_map = {p: (p in done_plates) for p in plates}
-
     items = list(qs)
-    for o in items:
-        o.is_repeat = bool(repeat_map.get(_plate_of(o)))
+    # --- tekrar geliş uyarısı (son 30 gün içinde DONE varsa) ---
+    mark_repeat_visits(items, branch_id, days=30)
 
     # güvenli plaka gösterimi
     for o in items:
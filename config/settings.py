@@ -56,7 +56,7 @@ INSTALLED_APPS = [
     "apps.tirehotel",
     "apps.notifications",
     "apps.inventory.apps.InventoryConfig",
-    "apps.reports",
+    "apps.reports.apps.ReportsConfig",
     "apps.marketing.apps.MarketingConfig",
 ]
 
@@ -70,6 +70,9 @@ MIDDLEWARE = [
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
 
+    # ✅ şube/rol bilgisi istek başına bir kez (request.branch_ctx)
+    "apps.core.middleware.BranchContextMiddleware",
+
     # ✅ usta/admin kitleme
     "apps.core.middleware.WorkerLockdownMiddleware",
 
@@ -168,6 +171,35 @@ MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
 
+# -------------------------------------------------
+# CACHE
+# -------------------------------------------------
+# Birden fazla gunicorn worker varsa ortak bir cache (redis/memcached/db) kullanin;
+# LocMem process'e ozeldir.
+CACHES = {
+    "default": {
+        "BACKEND": env("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": env("CACHE_LOCATION", "ceylan-garaj"),
+    }
+}
+if CACHES["default"]["BACKEND"].endswith("LocMemCache"):
+    # Rapor gun ozetleri sube x gun anahtar uretir; varsayilan 300 sinir dar kalir
+    CACHES["default"]["OPTIONS"] = {"MAX_ENTRIES": int(env("CACHE_MAX_ENTRIES", "5000"))}
+# Kullanici uye/grup cache suresi (sn). Degisiklikte signal ile zaten silinir.
+ROLE_CACHE_TIMEOUT = int(env("ROLE_CACHE_TIMEOUT", "300"))
+# Gecmis gun rapor ozetleri (sn). 0 = suresiz (degisiklikte signal ile silinir).
+# Ortak cache'i olmayan coklu worker'da bayatligi sinirlamak icin sure verin.
+REPORT_CACHE_TIMEOUT = int(env("REPORT_CACHE_TIMEOUT", "0")) or None
+# Rapor / export tarih araliginin ust siniri (gun); daha uzun istekte baslangic kirpilir
+REPORT_MAX_DAYS = int(env("REPORT_MAX_DAYS", "732"))
+# Rapor export'larinda DB'den tek seferde cekilen satir sayisi (.iterator chunk_size)
+EXPORT_CHUNK_SIZE = int(env("EXPORT_CHUNK_SIZE", "2000"))
+# Lastik otel doluluk haritasi cache suresi (sn); giris/duzenleme/cikista versiyon artar
+TIREHOTEL_MAP_CACHE_TIMEOUT = int(env("TIREHOTEL_MAP_CACHE_TIMEOUT", "3600"))
+# Haritada "son tarihi yaklasan" sayilan gun
+TIREHOTEL_DUE_SOON_DAYS = int(env("TIREHOTEL_DUE_SOON_DAYS", "7"))
+
+
 # -------------------------------------------------
 # DEFAULT PK
 # -------------------------------------------------
@@ -184,8 +216,46 @@ WHATSAPP_TOKEN = env("WHATSAPP_TOKEN", "")
 WHATSAPP_PHONE_NUMBER_ID = env("WHATSAPP_PHONE_NUMBER_ID", "")
 WHATSAPP_API_VERSION = env("WHATSAPP_API_VERSION", "v19.0")
 
+WHATSAPP_API_BASE_URL = env("WHATSAPP_API_BASE_URL", "https://graph.facebook.com")
+
 SMS_API_KEY = env("SMS_API_KEY", "")
 SMS_SENDER = env("SMS_SENDER", "")
+SMS_API_URL = env("SMS_API_URL", "")
+
+# Yuk testi: provider'lari yerel sahte sunucuya yonlendir (manage.py fake_notify_server)
+# orn. NOTIFY_FAKE_SERVER_URL=http://127.0.0.1:8025
+NOTIFY_FAKE_SERVER_URL = env("NOTIFY_FAKE_SERVER_URL", "")
+if NOTIFY_FAKE_SERVER_URL:
+    WHATSAPP_API_BASE_URL = NOTIFY_FAKE_SERVER_URL
+    SMS_API_URL = NOTIFY_FAKE_SERVER_URL.rstrip("/") + "/sms/send"
+    WHATSAPP_TOKEN = WHATSAPP_TOKEN or "fake-token"
+    WHATSAPP_PHONE_NUMBER_ID = WHATSAPP_PHONE_NUMBER_ID or "100000000000000"
+    SMS_API_KEY = SMS_API_KEY or "fake-key"
+
+# Outbox (drain_notifications worker): deneme sayisi ve ustel bekleme (sn)
+NOTIFY_MAX_ATTEMPTS = int(env("NOTIFY_MAX_ATTEMPTS", "6"))
+NOTIFY_RETRY_BASE_SECONDS = int(env("NOTIFY_RETRY_BASE_SECONDS", "30"))
+NOTIFY_RETRY_MAX_SECONDS = int(env("NOTIFY_RETRY_MAX_SECONDS", "3600"))
+# Worker'in sahiplendigi kaydi baska worker'in almamasi icin sure
+NOTIFY_CLAIM_SECONDS = int(env("NOTIFY_CLAIM_SECONDS", "300"))
+# Provider HTTP: keep-alive havuz boyutu, baglanti hatasi / 429 tekrar sayisi, timeout (sn)
+NOTIFY_HTTP_POOL_SIZE = int(env("NOTIFY_HTTP_POOL_SIZE", "20"))
+NOTIFY_HTTP_RETRIES = int(env("NOTIFY_HTTP_RETRIES", "3"))
+NOTIFY_HTTP_BACKOFF = float(env("NOTIFY_HTTP_BACKOFF", "0.5"))
+NOTIFY_HTTP_CONNECT_TIMEOUT = float(env("NOTIFY_HTTP_CONNECT_TIMEOUT", "5"))
+NOTIFY_HTTP_READ_TIMEOUT = float(env("NOTIFY_HTTP_READ_TIMEOUT", "15"))
+# Devre kesici: ardisik gecici hata esigi ve acik kalma suresi (sn).
+# Durum cache'te tutulur; worker'lar arasi ortak olmasi icin ortak CACHE_BACKEND gerekir.
+NOTIFY_CB_FAILURES = int(env("NOTIFY_CB_FAILURES", "5"))
+NOTIFY_CB_OPEN_SECONDS = float(env("NOTIFY_CB_OPEN_SECONDS", "60"))
+# Toplu gonderim: thread sayisi ve provider basina saniyelik mesaj siniri (token bucket)
+NOTIFY_BATCH_WORKERS = int(env("NOTIFY_BATCH_WORKERS", "8"))
+NOTIFY_WHATSAPP_RATE = float(env("NOTIFY_WHATSAPP_RATE", "20"))
+NOTIFY_SMS_RATE = float(env("NOTIFY_SMS_RATE", "10"))
+# Lastik otel "son tarihi gecti" hatirlatmasi icin geriye bakilan gun
+TIREHOTEL_OVERDUE_LOOKBACK_DAYS = int(env("TIREHOTEL_OVERDUE_LOOKBACK_DAYS", "30"))
+# NOTIFY_*_PROVIDER=fake icin yapay gecikme (ms)
+NOTIFY_FAKE_LATENCY_MS = int(env("NOTIFY_FAKE_LATENCY_MS", "50"))
 
 # -------------------------------------------------
 # ROLE SETTINGS
@@ -197,4 +267,24 @@ ROLE_WORKER_GROUP = env("ROLE_WORKER_GROUP", "USTA")
 # Usta ekranı / admin ekranı ayrımı
 WORKER_HOME_URL = env("WORKER_HOME_URL", "/workorders/my/")
 ADMIN_HOME_URL = env("ADMIN_HOME_URL", "/workorders/")
+
+# -------------------------------------------------
+# İŞ EMRİ LİSTESİ
+# -------------------------------------------------
+# Sayfa başına kayıt (keyset sayfalama)
+WORKORDERS_PAGE_SIZE = int(env("WORKORDERS_PAGE_SIZE", "50"))
+# Filtre yokken: açık işler + son N gün
+WORKORDERS_DEFAULT_DAYS = int(env("WORKORDERS_DEFAULT_DAYS", "30"))
+
+# -------------------------------------------------
+# LASTİK OTEL LİSTESİ
+# -------------------------------------------------
+# Sayfa başına kayıt (keyset sayfalama)
+TIREHOTEL_PAGE_SIZE = int(env("TIREHOTEL_PAGE_SIZE", "50"))
+# Foto kucuk boyutlari (process_tire_photos worker'i uretir): WEBP veya JPEG
+TIREHOTEL_IMAGE_FORMAT = env("TIREHOTEL_IMAGE_FORMAT", "WEBP")
+TIREHOTEL_IMAGE_QUALITY = int(env("TIREHOTEL_IMAGE_QUALITY", "80"))
+# Uzun kenar (px): liste kucuk resmi / etiket onizlemesi
+TIREHOTEL_THUMB_PX = int(env("TIREHOTEL_THUMB_PX", "240"))
+TIREHOTEL_PREVIEW_PX = int(env("TIREHOTEL_PREVIEW_PX", "1024"))
 INSTAGRAM_URL = "https://www.instagram.com/ceylan_garaj/"
\ No newline at end of file